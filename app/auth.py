@@ -1,23 +1,70 @@
-from datetime import datetime, timedelta
-import random
+import asyncio
+from datetime import timedelta
+from functools import lru_cache
+import hashlib
+import hmac
 import os
 import random
+import secrets
+import time
 from typing import Optional
+from weakref import WeakKeyDictionary
 
+import anyio
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError
+import bcrypt
+import jwt
 from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from pydantic import BaseModel
-from sqlmodel import Field, Session, SQLModel, select
+from sqlalchemy import or_, update
+from sqlmodel import Session, SQLModel, select
 
 from app.database import engine, get_session
 from app.models import Party, User, UserCreate, UserRead, UserRegister, UserRole
+from app.utils import ExpiringLRUCache
 
 
 ADMIN_USERNAME = "admin"
 ADMIN_PASSWORD = "asdf1234"
 ADMIN_GAME_ID = "admin#0000"
+# Precomputed password hash of ADMIN_PASSWORD; avoids hashing on every startup.
+ADMIN_PASSWORD_HASH = os.getenv("ADMIN_PASSWORD_HASH")
+
+SECRET_KEY = os.getenv("SECRET_KEY", "change-me")
+ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+if ALGORITHM.startswith("HS"):
+    SIGNING_KEY = VERIFY_KEY = SECRET_KEY
+else:
+    # Asymmetric algorithms: every process both issues (login) and verifies
+    # tokens, so a missing key fails at import rather than on the first login.
+    SIGNING_KEY = os.getenv("JWT_PRIVATE_KEY")
+    VERIFY_KEY = os.getenv("JWT_PUBLIC_KEY")
+    _missing_keys = [
+        name
+        for name, value in (("JWT_PRIVATE_KEY", SIGNING_KEY), ("JWT_PUBLIC_KEY", VERIFY_KEY))
+        if not value
+    ]
+    if _missing_keys:
+        raise RuntimeError(f"JWT_ALGORITHM={ALGORITHM} requires {' and '.join(_missing_keys)} to be set")
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+_DEFAULT_EXPIRE_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+# Tokens only carry sub/role/game_id/exp; skip checks for claims never issued.
+_JWT_DECODE_OPTIONS = {"require": ["exp", "sub"], "verify_aud": False, "verify_iss": False}
+# argon2id "interactive" parameters (46 MiB, t=1, p=1) per OWASP guidance.
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "47104"))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "1"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+TOKEN_CACHE_MAXSIZE = int(os.getenv("TOKEN_CACHE_MAXSIZE", "10000"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+PASSWORD_VERIFY_CACHE_MAXSIZE = int(os.getenv("PASSWORD_VERIFY_CACHE_MAXSIZE", "10000"))
+PASSWORD_VERIFY_CACHE_TTL_SECONDS = int(os.getenv("PASSWORD_VERIFY_CACHE_TTL_SECONDS", "60"))
+
+_ALLOWED_ROLES = frozenset({"admin", "user", "guest"})
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
 class AuthenticatedUser(BaseModel):
@@ -54,7 +101,7 @@ def get_authenticated_user(
         )
 
     normalized_role = (x_user_role or "guest").lower()
-    if normalized_role not in {"admin", "user", "guest"}:
+    if normalized_role not in _ALLOWED_ROLES:
         normalized_role = "guest"
 
     return AuthenticatedUser(
@@ -66,8 +113,15 @@ def get_authenticated_user(
 
 
 def require_role(*roles: str):
+    return _role_dependency(frozenset(roles))
+
+
+@lru_cache(maxsize=None)
+def _role_dependency(allowed_roles: frozenset[str]):
+    # One callable per role set, so FastAPI's per-request dependency cache can
+    # dedupe the same gate used by several dependencies of a route.
     def dependency(user: AuthenticatedUser = Depends(get_authenticated_user)) -> AuthenticatedUser:
-        if user.role not in roles:
+        if user.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail="권한이 없습니다."
             )
@@ -85,15 +139,6 @@ def require_registered_user(
 def require_admin(user: AuthenticatedUser = Depends(require_role("admin"))) -> AuthenticatedUser:
     return user
 
-SECRET_KEY = os.getenv("SECRET_KEY", "change-me")
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
-
-router = APIRouter(prefix="/auth", tags=["auth"])
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
-
 
 class Token(SQLModel):
     access_token: str
@@ -105,60 +150,211 @@ class TokenData(SQLModel):
     role: Optional[str] = None
 
 
+@lru_cache(maxsize=1024)
+def _suggestion_base(identifier: str) -> str:
+    return (identifier or "player").split("#", 1)[0] or "player"
+
+
 def generate_party_identifier_suggestion(identifier: str) -> str:
-    base = (identifier or "player").split("#", 1)[0] or "player"
-    random_tag = f"{random.randint(0, 9999):04d}"
+    base = _suggestion_base(identifier)
+    random_tag = f"{random.randrange(10000):04d}"
     return f"{base}#{random_tag}"
 
 
+_argon2_hasher = PasswordHasher(
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM,
+)
+
+
+def _encode_bcrypt_password(password: str) -> bytes:
+    # bcrypt only uses the first 72 bytes; truncate explicitly as passlib did.
+    return password.encode("utf-8")[:72]
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    if hashed_password.startswith("$argon2"):
+        try:
+            return _argon2_hasher.verify(hashed_password, plain_password)
+        except VerificationError:
+            return False
+    # Legacy bcrypt hashes stay valid until the next successful login rehashes them.
+    return bcrypt.checkpw(_encode_bcrypt_password(plain_password), hashed_password.encode("utf-8"))
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _argon2_hasher.hash(password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    if not hashed_password.startswith("$argon2"):
+        return True
+    return _argon2_hasher.check_needs_rehash(hashed_password)
+
+
+@lru_cache(maxsize=None)
+def _dummy_password_hash() -> str:
+    # Hashed on first use rather than at import: an argon2 hash costs tens of
+    # milliseconds and ~46 MiB, paid by every worker and test run otherwise.
+    return _argon2_hasher.hash("x" * 16)
+
+
+def _verify_unknown_user_password(password: str) -> bool:
+    """Spend a real verification when the username is unknown.
+
+    Login then takes the same time whether or not the account exists.
+    """
+
+    verify_password(password, _dummy_password_hash())
+    return False
+
+
+# A CapacityLimiter belongs to the event loop it was first used on, so each
+# loop gets its own; the pending counter is shared by the whole process.
+_password_hash_limiters: WeakKeyDictionary[asyncio.AbstractEventLoop, anyio.CapacityLimiter] = (
+    WeakKeyDictionary()
+)
+_pending_password_hash_tasks = 0
+
+
+def _password_hash_limiter() -> anyio.CapacityLimiter:
+    loop = asyncio.get_running_loop()
+    limiter = _password_hash_limiters.get(loop)
+    if limiter is None:
+        limiter = _password_hash_limiters[loop] = anyio.CapacityLimiter(os.cpu_count() or 1)
+    return limiter
+
+
+async def run_password_hash_task(func, *args):
+    """Run a password hashing operation in a worker thread capped at the CPU count.
+
+    Password hashing is CPU-bound by design, so running it on the event loop
+    stalls every other request; a dedicated limiter keeps concurrent hashes from
+    occupying more threads than there are cores. Once PASSWORD_HASH_MAX_PENDING
+    operations are queued, further requests are rejected with 503 instead of
+    waiting behind the backlog.
+    """
+
+    global _pending_password_hash_tasks
+    if _pending_password_hash_tasks >= PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": "1"},
+        )
+
+    try:
+        _pending_password_hash_tasks += 1
+        return await anyio.to_thread.run_sync(func, *args, limiter=_password_hash_limiter())
+    finally:
+        _pending_password_hash_tasks -= 1
+
+
+# Successful verifications keyed by an HMAC of (stored hash, password) under a
+# per-process random key, so the cache never holds anything reusable offline.
+# Keying on the stored hash means a password change invalidates old entries.
+_verified_password_cache = ExpiringLRUCache(PASSWORD_VERIFY_CACHE_MAXSIZE)
+_verified_password_cache_key = secrets.token_bytes(32)
+
+
+async def verify_password_cached(plain_password: str, hashed_password: str) -> bool:
+    cache_key = hmac.new(
+        _verified_password_cache_key,
+        f"{hashed_password}:{plain_password}".encode("utf-8"),
+        hashlib.sha256,
+    ).digest()
+    if _verified_password_cache.get(cache_key):
+        return True
+
+    password_ok = await run_password_hash_task(verify_password, plain_password, hashed_password)
+    if password_ok:
+        _verified_password_cache.set(
+            cache_key, True, time.time() + PASSWORD_VERIFY_CACHE_TTL_SECONDS
+        )
+    return password_ok
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    expire_seconds = int(expires_delta.total_seconds()) if expires_delta else _DEFAULT_EXPIRE_SECONDS
+    to_encode["exp"] = int(time.time()) + expire_seconds
+    return jwt.encode(to_encode, SIGNING_KEY, algorithm=ALGORITHM)
+
+
+token_cache = ExpiringLRUCache(TOKEN_CACHE_MAXSIZE)
+
+
+def _token_cache_key(token: str) -> bytes:
+    # Fixed-size digest keeps cache memory independent of token length.
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+def _remember_token_user(request: Request | None, user: User, payload: dict) -> User:
+    if request is not None:
+        request.state.jwt_user = user
+        request.state.jwt_payload = payload
+    return user
 
 
-def get_user_from_token(token: str, session: Session) -> User:
+def decode_access_token(token: str) -> dict:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str | None = payload.get("sub")
-        if username is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        token_data = TokenData(username=username, role=payload.get("role"))
-    except JWTError:
+        payload = jwt.decode(
+            token, VERIFY_KEY, algorithms=[ALGORITHM], options=_JWT_DECODE_OPTIONS
+        )
+    except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return payload
+
 
-    statement = select(User).where(User.username == token_data.username)
-    user = session.exec(statement).first()
+def get_user_from_token(
+    token: str,
+    session: Session,
+    request: Request | None = None,
+    payload: dict | None = None,
+) -> User:
+    if request is not None:
+        resolved_user = getattr(request.state, "jwt_user", None)
+        if resolved_user is not None:
+            return resolved_user
+
+    cache_key = _token_cache_key(token)
+    cached = token_cache.get(cache_key)
+    if cached is not None:
+        cached_user_id, cached_payload = cached
+        user = session.get(User, cached_user_id)
+        if user is not None:
+            return _remember_token_user(request, user, cached_payload)
+        token_cache.discard(cache_key)
+
+    if payload is None:
+        payload = decode_access_token(token)
+    token_data = TokenData(username=payload["sub"], role=payload.get("role"))
+
+    user = session.scalar(select(User).where(User.username == token_data.username))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return user
+
+    expires_at = payload.get("exp")
+    if isinstance(expires_at, (int, float)):
+        token_cache.set(cache_key, (user.id, payload), expires_at)
+    return _remember_token_user(request, user, payload)
 
 
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    session: Session = Depends(get_session),
 ) -> User:
-    return get_user_from_token(token, session)
+    return get_user_from_token(token, session, request)
 
 
 async def add_user_to_request_state(request: Request, user: User = Depends(get_current_user)) -> User:
@@ -173,9 +369,17 @@ async def resolve_user_from_request(request: Request) -> Optional[User]:
     except HTTPException:
         return None
 
+    # Reject malformed or expired tokens before opening a database session.
+    payload = None
+    if getattr(request.state, "jwt_user", None) is None and token_cache.get(_token_cache_key(token)) is None:
+        try:
+            payload = decode_access_token(token)
+        except HTTPException:
+            return None
+
     with Session(engine) as session:
         try:
-            user = get_user_from_token(token, session)
+            user = get_user_from_token(token, session, request, payload)
         except HTTPException:
             return None
     request.state.user = user
@@ -187,6 +391,11 @@ def require_host_or_admin(
     session: Session = Depends(get_session),
     user: User = Depends(get_current_user),
 ) -> Party:
+    """Load the party and check the caller may manage it.
+
+    Routes take the returned party instead of loading it again.
+    """
+
     party = session.get(Party, party_id)
     if party is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="파티를 찾을 수 없습니다.")
@@ -202,23 +411,65 @@ def require_host_or_admin(
     return party
 
 
+def check_host_or_admin(
+    party_id: int,
+    session: Session = Depends(get_session),
+    user: User = Depends(get_current_user),
+) -> None:
+    """Authorization-only variant of require_host_or_admin.
+
+    For routes that never read the party itself: only ``host_id`` is
+    selected, instead of the whole row.
+    """
+
+    host_id = session.exec(select(Party.host_id).where(Party.id == party_id)).first()
+    if host_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="파티를 찾을 수 없습니다.")
+
+    if user.role != UserRole.ADMIN and host_id != str(user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="파티장만 수행할 수 있는 작업입니다."
+        )
+
+
+def update_party_as_host(
+    session: Session, party_id: int, user: User, *criteria, **values
+) -> bool:
+    """Update the party in one statement that also enforces host-or-admin.
+
+    The host check rides along in the UPDATE's WHERE clause. Only when no
+    row matched is the party looked up again, to raise the same 404/403 as
+    check_host_or_admin; False then means ``criteria`` excluded the party.
+    """
+
+    statement = update(Party).where(Party.id == party_id, *criteria).values(**values)
+    if user.role != UserRole.ADMIN:
+        statement = statement.where(Party.host_id == str(user.id))
+    if session.execute(statement).rowcount:
+        return True
+    check_host_or_admin(party_id, session, user)
+    return False
+
+
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
 async def register_user(
     user_in: UserRegister,
-    request: Request,
     session: Session = Depends(get_session),
     current_user: User | None = Depends(resolve_user_from_request),
 ) -> User:
-    request_payload = await request.json()
-    requested_role = request_payload.get("role")
-    if isinstance(requested_role, str) and requested_role.lower() != UserRole.USER:
+    requested_role = user_in.requested_role
+    if requested_role is not None and requested_role.lower() != UserRole.USER:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Role cannot be set during registration",
         )
 
-    existing_user = session.exec(select(User).where(User.username == user_in.username)).first()
-    if existing_user:
+    conflicts = session.exec(
+        select(User.username, User.game_id).where(
+            or_(User.username == user_in.username, User.game_id == user_in.game_id)
+        )
+    ).all()
+    if any(username == user_in.username for username, _ in conflicts):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={
@@ -227,8 +478,7 @@ async def register_user(
             },
         )
 
-    existing_identifier = session.exec(select(User).where(User.game_id == user_in.game_id)).first()
-    if existing_identifier:
+    if conflicts:
         suggestion = generate_party_identifier_suggestion(user_in.game_id)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -250,12 +500,11 @@ async def register_user(
     user = User(
         username=user_in.username,
         role=role,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await run_password_hash_task(get_password_hash, user_in.password),
         game_id=user_in.game_id,
     )
     session.add(user)
     session.commit()
-    session.refresh(user)
     return user
 
 
@@ -266,7 +515,7 @@ def require_authenticated_admin(current_user: User = Depends(get_current_user))
 
 
 @router.post("/admin/users", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def create_user_with_role(
+async def create_user_with_role(
     user_in: UserCreate,
     session: Session = Depends(get_session),
     current_user: User = Depends(require_authenticated_admin),
@@ -276,24 +525,23 @@ def create_user_with_role(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="기본 관리자 계정은 생성할 수 없습니다.",
         )
-    existing_user = session.exec(select(User).where(User.username == user_in.username)).first()
+    existing_user = session.scalar(select(User).where(User.username == user_in.username))
     if existing_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username already registered")
 
     user = User(
         username=user_in.username,
         role=user_in.role,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await run_password_hash_task(get_password_hash, user_in.password),
         game_id=user_in.game_id,
     )
     session.add(user)
     session.commit()
-    session.refresh(user)
     return user
 
 
 class UserRoleUpdate(SQLModel):
-    role: str = Field(regex="^(admin|user|guest)$")
+    role: UserRole
 
 
 @router.patch("/admin/users/{username}/role", response_model=UserRead)
@@ -308,88 +556,82 @@ def update_user_role(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="기본 관리자 계정은 수정할 수 없습니다.",
         )
-    user = session.exec(select(User).where(User.username == username)).first()
+    user = session.scalar(select(User).where(User.username == username))
     if user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
     user.role = role_update.role
     session.add(user)
     session.commit()
-    session.refresh(user)
     return user
 
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(get_session)
 ) -> Token:
-    user = session.exec(select(User).where(User.username == form_data.username)).first()
-    if user is None or not verify_password(form_data.password, user.hashed_password):
+    account = session.exec(
+        select(User.hashed_password, User.role, User.game_id).where(
+            User.username == form_data.username
+        )
+    ).first()
+    if account is None:
+        password_ok = await run_password_hash_task(_verify_unknown_user_password, form_data.password)
+    else:
+        password_ok = await verify_password_cached(form_data.password, account.hashed_password)
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if password_needs_rehash(account.hashed_password):
+        new_hash = await run_password_hash_task(get_password_hash, form_data.password)
+        session.execute(
+            update(User).where(User.username == form_data.username).values(hashed_password=new_hash)
+        )
+        session.commit()
+
     access_token = create_access_token(
         data={
-            "sub": user.username,
-            "role": user.role,
-            "game_id": user.game_id,
+            "sub": form_data.username,
+            "role": account.role,
+            "game_id": account.game_id,
         },
         expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
     )
     return Token(access_token=access_token, token_type="bearer")
 
 
+def _admin_password_outdated(hashed_password: str) -> bool:
+    if ADMIN_PASSWORD_HASH:
+        return hashed_password != ADMIN_PASSWORD_HASH
+    try:
+        return not verify_password(ADMIN_PASSWORD, hashed_password)
+    except Exception:
+        return True
+
+
 def ensure_default_admin(session: Session | None = None) -> None:
-    owns_session = session is None
     if session is None:
-        session = Session(engine)
+        with Session(engine) as owned_session:
+            ensure_default_admin(owned_session)
+        return
 
-    admin_user = session.exec(select(User).where(User.username == ADMIN_USERNAME)).first()
+    admin_user = session.scalar(select(User).where(User.username == ADMIN_USERNAME))
     if admin_user is None:
-        hashed_password = get_password_hash(ADMIN_PASSWORD)
         admin_user = User(
             username=ADMIN_USERNAME,
             role=UserRole.ADMIN,
-            hashed_password=hashed_password,
+            hashed_password=ADMIN_PASSWORD_HASH or get_password_hash(ADMIN_PASSWORD),
             game_id=ADMIN_GAME_ID,
         )
-        session.add(admin_user)
-        session.commit()
-        if owns_session:
-            session.close()
-        return
-
-    updated = False
-    if admin_user.role != UserRole.ADMIN:
-        admin_user.role = UserRole.ADMIN
-        updated = True
-
-    password_mismatch = False
-    try:
-        password_mismatch = not verify_password(ADMIN_PASSWORD, admin_user.hashed_password)
-    except Exception:
-        hashed_password = get_password_hash(ADMIN_PASSWORD)
-        password_mismatch = admin_user.hashed_password != hashed_password
     else:
-        hashed_password = None
-
-    if password_mismatch:
-        hashed_password = hashed_password or get_password_hash(ADMIN_PASSWORD)
-        admin_user.hashed_password = hashed_password
-        updated = True
-
-    if admin_user.game_id != ADMIN_GAME_ID:
+        admin_user.role = UserRole.ADMIN
         admin_user.game_id = ADMIN_GAME_ID
-        updated = True
-
-    if updated:
-        session.add(admin_user)
-        session.commit()
-
-    if owns_session:
-        session.close()
-
+        if _admin_password_outdated(admin_user.hashed_password):
+            admin_user.hashed_password = ADMIN_PASSWORD_HASH or get_password_hash(ADMIN_PASSWORD)
 
+    session.add(admin_user)
+    session.commit()
@@ -1,19 +1,81 @@
 from collections.abc import Generator
+import logging
 import os
 
-from sqlalchemy import inspect, text
+import orjson
+from sqlalchemy import ColumnElement, Integer, String, and_, bindparam, column, event, func, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
 from sqlmodel import Session, SQLModel, create_engine, select
 
-from app.models import GearPreset, GearPresetVisibility, PartySlot
+from app.models import (
+    MEMBER_STATE_CODES,
+    GearPreset,
+    GearPresetVisibility,
+    MemberState,
+    Party,
+    PartySlot,
+    PartyStatus,
+    PartyVisibility,
+    User,
+    UserRole,
+)
+from app.utils import derive_invite_code
+
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+_database_url = make_url(DATABASE_URL)
+_is_sqlite = _database_url.get_backend_name() == "sqlite"
+_is_sqlite_memory = _is_sqlite and _database_url.database in (None, "", ":memory:")
+
+connect_args = {"check_same_thread": False} if _is_sqlite else {}
+engine_kwargs: dict = {}
+if not _is_sqlite_memory:
+    engine_kwargs.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+if not _is_sqlite:
+    engine_kwargs.update(pool_pre_ping=True, pool_recycle=1800)
+
+
+def _dumps_json(value) -> str:
+    return orjson.dumps(value).decode()
+
+
+# JSON columns (slot presets, member gear presets) round-trip through orjson
+# instead of the stdlib json module.
+engine = create_engine(
+    DATABASE_URL,
+    connect_args=connect_args,
+    json_serializer=_dumps_json,
+    json_deserializer=orjson.loads,
+    **engine_kwargs,
+)
+
+
+if _is_sqlite and not _is_sqlite_memory:
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, _connection_record) -> None:
+        # WAL lets readers proceed while a writer holds the database.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
 
 
 def create_db_and_tables() -> None:
     SQLModel.metadata.create_all(engine)
     _ensure_slot_gearpreset_column()
+    _normalize_enum_values()
+    _dedupe_invite_codes()
+    _migrate_member_state_codes()
+    _ensure_indexes()
+    _ensure_search_indexes()
     _migrate_slot_presets()
     from app.auth import ensure_default_admin
 
@@ -21,9 +83,14 @@ def create_db_and_tables() -> None:
 
 
 def get_session() -> Generator[Session, None, None]:
-    """FastAPI dependency that yields a database session."""
+    """FastAPI dependency that yields a database session.
 
-    with Session(engine) as session:
+    Objects are not expired on commit: every column is assigned in Python
+    or by the INSERT itself, so write endpoints can return them without a
+    reload query.
+    """
+
+    with Session(engine, expire_on_commit=False) as session:
         yield session
 
 
@@ -37,6 +104,201 @@ def _ensure_slot_gearpreset_column() -> None:
         conn.execute(text("ALTER TABLE partyslot ADD COLUMN gear_preset_id INTEGER"))
 
 
+def _normalize_enum_values() -> None:
+    """Reset values the enum columns cannot load to each column's default.
+
+    Party visibility and status used to accept any string, and a single
+    leftover like ``visibility='bogus'`` would make every read of that row
+    fail. This runs before anything loads those tables.
+    """
+
+    defaults = (
+        (GearPreset.visibility, GearPresetVisibility.PERSONAL),
+        (User.role, UserRole.USER),
+        (Party.visibility, PartyVisibility.PUBLIC),
+        (Party.status, PartyStatus.OPEN),
+    )
+    with engine.begin() as conn:
+        for attribute, default in defaults:
+            table = attribute.class_.__table__
+            stored = table.c[attribute.key]
+            known = [member.value for member in type(default)]
+            # Compare as plain strings: the Enum type would reject the very
+            # values this is looking for.
+            conn.execute(
+                table.update().where(stored.cast(String).not_in(known)).values({stored: default})
+            )
+
+
+def _dedupe_invite_codes() -> None:
+    """Prepare tables that predate the unique invite code index.
+
+    Parties sharing a code keep it on the oldest row; the rest get a fresh
+    code so the unique index can be built. The old non-unique index is dropped.
+    """
+
+    with Session(engine) as session:
+        duplicated = session.exec(
+            select(Party.invite_code)
+            .where(Party.invite_code.is_not(None))
+            .group_by(Party.invite_code)
+            .having(func.count() > 1)
+        ).all()
+        if duplicated:
+            parties = session.exec(
+                select(Party).where(Party.invite_code.in_(duplicated)).order_by(Party.id)
+            ).all()
+            seen: set[str] = set()
+            for party in parties:
+                if party.invite_code not in seen:
+                    seen.add(party.invite_code)
+                    continue
+                party.invite_code = derive_invite_code(party.id)
+            session.add_all(parties)
+            session.commit()
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX IF EXISTS ix_party_invite_code"))
+
+
+def _migrate_member_state_codes() -> None:
+    """Convert member states stored as names into their integer codes.
+
+    PostgreSQL changes the column type in place. SQLite cannot alter a column
+    type, so the values are rewritten as codes; such columns keep TEXT
+    affinity, which the state type decorator reads back transparently. Tables
+    created after the switch store SMALLINT from the start.
+    """
+
+    state_column = next(
+        column for column in inspect(engine).get_columns("partymember") if column["name"] == "state"
+    )
+    if isinstance(state_column["type"], Integer):
+        return
+
+    # Unknown legacy names fall back to waiting, the state new members start in.
+    cases = " ".join(f"WHEN '{name}' THEN {code}" for name, code in MEMBER_STATE_CODES.items())
+    cases = f"CASE state {cases} ELSE {MEMBER_STATE_CODES[MemberState.WAITING]} END"
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            # The confirmed-member partial index predicate refers to the names.
+            conn.execute(text("DROP INDEX IF EXISTS ix_partymember_confirmed"))
+            conn.execute(
+                text(f"ALTER TABLE partymember ALTER COLUMN state TYPE SMALLINT USING {cases}")
+            )
+            return
+
+        # Rewritten TEXT-affinity columns read codes back as '0'..'5'; any
+        # other value still needs converting.
+        codes = bindparam("codes", [str(code) for code in MEMBER_STATE_CODES.values()], expanding=True)
+        if conn.execute(
+            text("SELECT 1 FROM partymember WHERE state NOT IN :codes LIMIT 1").bindparams(codes)
+        ).first() is None:
+            return
+        conn.execute(text("DROP INDEX IF EXISTS ix_partymember_confirmed"))
+        conn.execute(
+            text(f"UPDATE partymember SET state = {cases} WHERE state NOT IN :codes").bindparams(codes)
+        )
+
+
+def _ensure_indexes() -> None:
+    """Create model indexes missing from tables that predate them.
+
+    ``create_all`` skips existing tables entirely, so indexes added to the
+    models later would otherwise never reach an existing database. Indexes
+    the models no longer declare are dropped here too.
+    """
+
+    with engine.begin() as conn:
+        # Chat history pages by id; the created_at index only cost writes.
+        conn.execute(text("DROP INDEX IF EXISTS ix_chatmessage_party_created"))
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
+def _ensure_search_indexes() -> None:
+    """Back the ``ILIKE '%q%'`` filters in list_parties with trigram indexes.
+
+    pg_trgm GIN indexes let PostgreSQL answer leading-wildcard ILIKE without a
+    sequential scan. SQLite gets an FTS5 trigram mirror of party titles (see
+    party_title_filter). Other dialects keep the plain scan.
+    """
+
+    if engine.dialect.name == "sqlite":
+        _ensure_party_fts()
+        return
+    if engine.dialect.name != "postgresql":
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_party_title_trgm ON party USING gin (title gin_trgm_ops)")
+        )
+        conn.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_partyslot_role_trgm ON partyslot USING gin (role gin_trgm_ops)")
+        )
+
+
+_PARTY_FTS_TRIGGERS = (
+    """CREATE TRIGGER party_fts_ai AFTER INSERT ON party BEGIN
+        INSERT INTO party_fts(rowid, title) VALUES (new.id, new.title);
+    END""",
+    """CREATE TRIGGER party_fts_ad AFTER DELETE ON party BEGIN
+        INSERT INTO party_fts(party_fts, rowid, title) VALUES ('delete', old.id, old.title);
+    END""",
+    """CREATE TRIGGER party_fts_au AFTER UPDATE OF title ON party BEGIN
+        INSERT INTO party_fts(party_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        INSERT INTO party_fts(rowid, title) VALUES (new.id, new.title);
+    END""",
+)
+_party_fts_ready = False
+
+
+def _ensure_party_fts() -> None:
+    global _party_fts_ready
+
+    with engine.begin() as conn:
+        try:
+            conn.execute(
+                text(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS party_fts USING fts5("
+                    "title, content='party', content_rowid='id', tokenize='trigram')"
+                )
+            )
+        except OperationalError:
+            logger.warning("SQLite FTS5 trigram tokenizer unavailable; party search scans the table")
+            return
+        # Triggers disappear with the party table, so their absence means the
+        # mirror is new or out of date and has to be rebuilt from party.
+        has_triggers = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'party_fts_ai'")
+        ).first()
+        if not has_triggers:
+            for trigger in _PARTY_FTS_TRIGGERS:
+                conn.execute(text(trigger))
+            conn.execute(text("INSERT INTO party_fts(party_fts) VALUES ('rebuild')"))
+    _party_fts_ready = True
+
+
+def party_title_filter(q: str) -> ColumnElement[bool]:
+    """Return the list_parties title filter for search term ``q``.
+
+    With the SQLite FTS5 mirror, candidates come from the trigram index and
+    the ILIKE re-check keeps results identical to the plain scan. Terms
+    shorter than a trigram cannot use the index and fall back to the scan.
+    """
+
+    clause = Party.title.ilike(f"%{q}%")
+    if not _party_fts_ready or len(q) < 3:
+        return clause
+    candidates = text("SELECT rowid FROM party_fts WHERE title LIKE :title_pattern").bindparams(
+        title_pattern=f"%{q}%"
+    )
+    return and_(Party.id.in_(candidates.columns(column("rowid", Integer))), clause)
+
+
 def _migrate_slot_presets() -> None:
     with Session(engine) as session:
         legacy_slots = session.exec(
@@ -48,19 +310,20 @@ def _migrate_slot_presets() -> None:
         if not legacy_slots:
             return
 
-        for slot in legacy_slots:
-            preset = GearPreset(
+        presets = [
+            GearPreset(
                 owner_id="system",
                 visibility=GearPresetVisibility.MASTER,
                 preset=slot.preset or {},
                 metadata_={"source": "legacy_slot", "party_id": slot.party_id, "slot_id": slot.id},
             )
-            session.add(preset)
-            session.commit()
-            session.refresh(preset)
+            for slot in legacy_slots
+        ]
+        session.add_all(presets)
+        session.flush()
 
+        for slot, preset in zip(legacy_slots, presets):
             slot.gear_preset_id = preset.id
             slot.preset = None
-            session.add(slot)
-
+        session.add_all(legacy_slots)
         session.commit()
@@ -1,6 +1,11 @@
+import asyncio
+from collections import defaultdict
+import hashlib
 import logging
 import os
 from pathlib import Path
+import time
+from typing import NamedTuple
 
 from fastapi import (
     Depends,
@@ -10,24 +15,29 @@ from fastapi import (
     Request,
     Response,
     WebSocket,
-    WebSocketDisconnect,
     status,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
-from sqlalchemy import func
-from sqlmodel import Session, select
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse
+import orjson
+from sqlalchemy import and_, bindparam, func, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased, selectinload
+from sqlmodel import Session, SQLModel, select
 
 from app.auth import (
     AuthenticatedUser,
+    check_host_or_admin,
     get_current_user,
     require_host_or_admin,
     require_registered_user,
     require_role,
+    update_party_as_host,
 )
 from app.auth import resolve_user_from_request, router as auth_router
-from app.database import create_db_and_tables, engine, get_session
+from app.database import create_db_and_tables, engine, get_session, party_title_filter
 from app.models import (
+    CONFIRMED_STATE_PREDICATE,
     ChatMessage,
     ChatMessageCreate,
     ChatMessageRead,
@@ -53,15 +63,30 @@ from app.models import (
     PartyVisibility,
     User,
 )
-from app.services import calculate_open_slot_count, update_open_slot_count
-from app.utils import generate_invite_code
+from app.services import calculate_open_slot_count, recompute_open_slot_count
+from app.utils import ExpiringLRUCache, derive_invite_code
 
 logger = logging.getLogger(__name__)
 
 BASE_DIR = Path(__file__).resolve().parent
 STATIC_DIR = BASE_DIR / "static"
-
-app = FastAPI(title="Albion Party Planner", version="0.1.0")
+INDEX_PATH = STATIC_DIR / "index.html"
+INDEX_EXISTS = INDEX_PATH.exists()
+CONFIG_JS_PATH = STATIC_DIR / "config.js"
+CONFIG_JS_EXISTS = CONFIG_JS_PATH.exists()
+STATIC_CACHE_HEADERS = {"Cache-Control": f"public, max-age={os.getenv('STATIC_CACHE_MAX_AGE', '300')}"}
+CHAT_MEMBER_RECHECK_SECONDS = int(os.getenv("CHAT_MEMBER_RECHECK_SECONDS", "30"))
+CHAT_MEMBER_CACHE_TTL_SECONDS = int(os.getenv("CHAT_MEMBER_CACHE_TTL_SECONDS", "10"))
+CHAT_MEMBER_CACHE_MAXSIZE = int(os.getenv("CHAT_MEMBER_CACHE_MAXSIZE", "10000"))
+PARTY_DETAIL_CACHE_TTL_SECONDS = int(os.getenv("PARTY_DETAIL_CACHE_TTL_SECONDS", "5"))
+PARTY_DETAIL_CACHE_MAXSIZE = int(os.getenv("PARTY_DETAIL_CACHE_MAXSIZE", "1024"))
+# Derived invite codes are truncated digests sharing a unique index with
+# caller-chosen codes, so a write that collides is retried with a new code.
+INVITE_CODE_ATTEMPTS = 3
+
+app = FastAPI(
+    title="Albion Party Planner", version="0.1.0", default_response_class=ORJSONResponse
+)
 
 ADMIN_IDS = {admin.strip() for admin in os.getenv("ADMIN_IDS", "admin").split(",") if admin.strip()}
 
@@ -84,25 +109,82 @@ def _require_admin(admin_id: str) -> None:
 
 
 class PartyWebSocketManager:
-    def __init__(self) -> None:
-        self.active_connections: dict[int, set[WebSocket]] = {}
+    """Tracks chat subscribers per party.
+
+    Each socket gets a bounded outbound queue drained by its own relay task,
+    so broadcasting never waits on a slow client. A client whose queue fills
+    up is dropped instead of stalling the rest of the room.
+    """
+
+    def __init__(self, queue_size: int = 64) -> None:
+        self.queue_size = queue_size
+        self.active_connections: dict[int, dict[WebSocket, asyncio.Queue[str]]] = {}
+        self._relay_tasks: dict[WebSocket, asyncio.Task] = {}
+        # The event loop only keeps weak references to tasks.
+        self._close_tasks: set[asyncio.Task] = set()
 
     async def connect(self, party_id: int, websocket: WebSocket) -> None:
         await websocket.accept()
-        self.active_connections.setdefault(party_id, set()).add(websocket)
+        queue: asyncio.Queue[str] = asyncio.Queue(maxsize=self.queue_size)
+        self.active_connections.setdefault(party_id, {})[websocket] = queue
+        self._relay_tasks[websocket] = asyncio.create_task(self._relay(party_id, websocket, queue))
 
     def disconnect(self, party_id: int, websocket: WebSocket) -> None:
-        if party_id in self.active_connections:
-            self.active_connections[party_id].discard(websocket)
-            if not self.active_connections[party_id]:
+        connections = self.active_connections.get(party_id)
+        if connections is not None:
+            connections.pop(websocket, None)
+            if not connections:
                 self.active_connections.pop(party_id, None)
+        task = self._relay_tasks.pop(websocket, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
 
-    async def broadcast(self, party_id: int, message: dict) -> None:
-        for connection in list(self.active_connections.get(party_id, set())):
+    async def broadcast(self, party_id: int, message: dict | str) -> None:
+        """Queue ``message`` for every subscriber; strings are sent as already-encoded JSON."""
+
+        connections = self.active_connections.get(party_id)
+        if not connections:
+            return
+        payload = message if isinstance(message, str) else orjson.dumps(message).decode()
+        # Iterate the live dict (no copy); removals wait until the loop is done.
+        slow: list[WebSocket] = []
+        for connection, queue in connections.items():
             try:
-                await connection.send_json(message)
-            except RuntimeError:
-                self.disconnect(party_id, connection)
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                slow.append(connection)
+        for connection in slow:
+            logger.warning("Dropping slow chat subscriber in party %s", party_id)
+            self.disconnect(party_id, connection)
+            task = asyncio.create_task(self._close(connection))
+            self._close_tasks.add(task)
+            task.add_done_callback(self._close_tasks.discard)
+
+    def expire_member(self, party_id: int, member_id: int) -> None:
+        """Make the member's open sockets re-check membership on their next message."""
+
+        for connection in list(self.active_connections.get(party_id, {})):
+            if getattr(connection.state, "member_id", None) == member_id:
+                connection.state.member_checked_at = float("-inf")
+
+    async def _relay(self, party_id: int, websocket: WebSocket, queue: asyncio.Queue[str]) -> None:
+        try:
+            while True:
+                payload = await queue.get()
+                await websocket.send_text(payload)
+        except Exception:
+            # Send failures differ by server (RuntimeError, OSError,
+            # ClientDisconnected, ...); any of them means the socket is gone.
+            logger.debug("Chat relay for party %s stopped", party_id, exc_info=True)
+        finally:
+            self.disconnect(party_id, websocket)
+
+    @staticmethod
+    async def _close(websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        except Exception:
+            logger.debug("Closing a dropped chat subscriber failed", exc_info=True)
 
 
 manager = PartyWebSocketManager()
@@ -123,11 +205,22 @@ async def attach_current_user(request: Request, call_next):
 app.include_router(auth_router)
 
 
+def _static_file_response(request: Request, path: Path, media_type: str | None = None) -> Response:
+    response = FileResponse(
+        path, media_type=media_type, headers=STATIC_CACHE_HEADERS, stat_result=path.stat()
+    )
+    if request.headers.get("if-none-match") == response.headers["etag"]:
+        not_modified_headers = {
+            name: response.headers[name] for name in ("etag", "last-modified", "cache-control")
+        }
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=not_modified_headers)
+    return response
+
+
 @app.get("/", include_in_schema=False, response_class=FileResponse)
-def serve_index() -> Response:
-    index_path = STATIC_DIR / "index.html"
-    if index_path.exists():
-        return FileResponse(index_path)
+def serve_index(request: Request) -> Response:
+    if INDEX_EXISTS:
+        return _static_file_response(request, INDEX_PATH)
     return JSONResponse({"status": "ok"})
 
 
@@ -137,21 +230,21 @@ def health() -> dict[str, str]:
 
 
 @app.get("/config.js", include_in_schema=False, response_class=FileResponse)
-def serve_config_js() -> Response:
-    config_path = STATIC_DIR / "config.js"
-    if config_path.exists():
-        return FileResponse(config_path, media_type="application/javascript")
+def serve_config_js(request: Request) -> Response:
+    if CONFIG_JS_EXISTS:
+        return _static_file_response(request, CONFIG_JS_PATH, media_type="application/javascript")
     return JSONResponse({"status": "ok"})
 
 
 @app.get("/gear-presets/master", response_model=list[GearPresetRead], tags=["gear-presets"])
-def list_master_presets(session: Session = Depends(get_session)) -> list[GearPresetRead]:
+def list_master_presets(session: Session = Depends(get_session)) -> ORJSONResponse:
     statement = (
         select(GearPreset)
         .where(GearPreset.visibility == GearPresetVisibility.MASTER)
         .order_by(GearPreset.created_at.desc())
     )
-    return session.exec(statement).all()
+    presets = session.exec(statement)
+    return ORJSONResponse([_row_dict(preset, _GEAR_PRESET_READ_FIELDS) for preset in presets])
 
 
 @app.post(
@@ -174,7 +267,6 @@ def create_master_preset(
     )
     session.add(preset)
     session.commit()
-    session.refresh(preset)
     return preset
 
 
@@ -194,7 +286,6 @@ def update_master_preset(
 
     session.add(preset)
     session.commit()
-    session.refresh(preset)
     return preset
 
 
@@ -220,7 +311,7 @@ def list_personal_presets(
     request: Request,
     session: Session = Depends(get_session),
     user: AuthenticatedUser = Depends(require_registered_user),
-) -> list[GearPresetRead]:
+) -> ORJSONResponse:
     owner_id = _get_current_owner_id(request, user)
     statement = (
         select(GearPreset)
@@ -230,7 +321,8 @@ def list_personal_presets(
         )
         .order_by(GearPreset.created_at.desc())
     )
-    return session.exec(statement).all()
+    presets = session.exec(statement)
+    return ORJSONResponse([_row_dict(preset, _GEAR_PRESET_READ_FIELDS) for preset in presets])
 
 
 @app.post(
@@ -254,7 +346,6 @@ def create_personal_preset(
     )
     session.add(preset)
     session.commit()
-    session.refresh(preset)
     return preset
 
 
@@ -285,7 +376,6 @@ def update_personal_preset(
 
     session.add(preset)
     session.commit()
-    session.refresh(preset)
     return preset
 
 
@@ -310,6 +400,61 @@ def _get_party_or_404(session: Session, party_id: int) -> Party:
     return party
 
 
+def _ensure_party_exists(session: Session, party_id: int) -> None:
+    if session.exec(select(Party.id).where(Party.id == party_id)).first() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="파티를 찾을 수 없습니다.")
+
+
+_PARTY_DETAIL_FIELDS = tuple(name for name in PartyDetail.model_fields if name not in {"slots", "members"})
+_SLOT_READ_FIELDS = tuple(PartySlotRead.model_fields)
+_MEMBER_READ_FIELDS = tuple(PartyMemberRead.model_fields)
+_CHAT_READ_FIELDS = tuple(ChatMessageRead.model_fields)
+_GEAR_PRESET_READ_FIELDS = tuple(GearPresetRead.model_fields)
+
+
+def _row_dict(row: SQLModel, fields: tuple[str, ...]) -> dict:
+    return {name: getattr(row, name) for name in fields}
+
+
+def _party_detail_dict(
+    party: Party, slots: list[PartySlot], members: list[PartyMember]
+) -> dict:
+    """Plain-dict PartyDetail for read endpoints that return ORJSONResponse directly.
+
+    Database rows are already typed, so these endpoints skip both model
+    construction and FastAPI's response_model validation pass.
+    """
+
+    detail = _row_dict(party, _PARTY_DETAIL_FIELDS)
+    detail["slots"] = [_row_dict(slot, _SLOT_READ_FIELDS) for slot in slots]
+    detail["members"] = [_row_dict(member, _MEMBER_READ_FIELDS) for member in members]
+    return detail
+
+
+# Encoded GET /parties/{id} bodies and their ETags. Every route that changes
+# a party's row, slots or members drops its entry; the TTL bounds staleness
+# across workers.
+party_detail_cache = ExpiringLRUCache(PARTY_DETAIL_CACHE_MAXSIZE)
+
+
+def _forget_party_detail(party_id: int) -> None:
+    party_detail_cache.discard(party_id)
+
+
+def _build_party_detail(
+    party: Party, slots: list[PartySlot], members: list[PartyMember]
+) -> PartyDetail:
+    # Rows come straight from the ORM, so skip re-validating every party field.
+    return PartyDetail.model_construct(
+        **_row_dict(party, _PARTY_DETAIL_FIELDS),
+        slots=[PartySlotRead.model_construct(**_row_dict(slot, _SLOT_READ_FIELDS)) for slot in slots],
+        members=[
+            PartyMemberRead.model_construct(**_row_dict(member, _MEMBER_READ_FIELDS))
+            for member in members
+        ],
+    )
+
+
 def _get_slot_or_404(session: Session, party_id: int, slot_id: int) -> PartySlot:
     slot = session.get(PartySlot, slot_id)
     if slot is None or slot.party_id != party_id:
@@ -340,28 +485,27 @@ def _get_current_owner_id(request: Request, user: AuthenticatedUser) -> str:
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="로그인이 필요한 작업입니다.")
 
 
-def _count_confirmed_members(
-    session: Session, party_id: int, exclude_member_id: int | None = None
-) -> int:
-    statement = select(func.count()).where(
-        PartyMember.party_id == party_id,
-        PartyMember.state.in_([MemberState.ACCEPTED, MemberState.LOCKED]),
+# Built once so each capacity check only binds parameters; SQLAlchemy's
+# compiled-statement cache then hits without re-keying a fresh Select.
+_CONFIRMED_COUNTS_STATEMENT = (
+    select(PartyMember.slot_id, func.count())
+    .where(
+        PartyMember.party_id == bindparam("party_id"),
+        text(CONFIRMED_STATE_PREDICATE),
+        PartyMember.id != bindparam("exclude_member_id"),
     )
-    if exclude_member_id is not None:
-        statement = statement.where(PartyMember.id != exclude_member_id)
-    return session.exec(statement).one()
+    .group_by(PartyMember.slot_id)
+)
 
 
-def _count_slot_confirmed_members(
-    session: Session, slot_id: int, exclude_member_id: int | None = None
-) -> int:
-    statement = select(func.count()).where(
-        PartyMember.slot_id == slot_id,
-        PartyMember.state.in_([MemberState.ACCEPTED, MemberState.LOCKED]),
-    )
-    if exclude_member_id is not None:
-        statement = statement.where(PartyMember.id != exclude_member_id)
-    return session.exec(statement).one()
+def _confirmed_counts(
+    session: Session, party_id: int, exclude_member_id: int | None = None
+) -> dict[int | None, int]:
+    """Return confirmed member counts per slot id (None for unslotted members)."""
+
+    # Primary keys start at 1, so 0 excludes nobody for not-yet-saved members.
+    params = {"party_id": party_id, "exclude_member_id": exclude_member_id or 0}
+    return dict(session.exec(_CONFIRMED_COUNTS_STATEMENT, params=params).all())
 
 
 def _ensure_capacity_constraints(
@@ -371,23 +515,26 @@ def _ensure_capacity_constraints(
     member: PartyMember,
     target_state: str,
 ) -> None:
-    if target_state not in {MemberState.ACCEPTED, MemberState.LOCKED}:
+    confirmed_states = {MemberState.ACCEPTED, MemberState.LOCKED}
+    if target_state not in confirmed_states:
+        return
+    # A member who already counts toward capacity and stays in the same slot
+    # cannot push either total over its limit. Unsaved members never count yet.
+    was_confirmed = member.id is not None and member.state in confirmed_states
+    slot_changed = target_slot is not None and target_slot.id != member.slot_id
+    if was_confirmed and not slot_changed:
         return
 
-    confirmed = _count_confirmed_members(
-        session, party.id, exclude_member_id=member.id
-    )
-    if party.capacity and confirmed >= party.capacity:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="파티 정원이 가득 찼습니다.")
+    slot_limit = (target_slot.ip_target or party.capacity) if target_slot else None
+    if not party.capacity and not slot_limit:
+        return
 
-    if target_slot:
-        slot_limit = target_slot.ip_target or party.capacity
-        if slot_limit:
-            occupied = _count_slot_confirmed_members(
-                session, target_slot.id, exclude_member_id=member.id
-            )
-            if occupied >= slot_limit:
-                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="해당 슬롯 정원이 가득 찼습니다.")
+    # One grouped query yields both the party-wide total and the slot occupancy.
+    counts = _confirmed_counts(session, party.id, exclude_member_id=member.id)
+    if party.capacity and sum(counts.values()) >= party.capacity:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="파티 정원이 가득 찼습니다.")
+    if slot_limit and counts.get(target_slot.id, 0) >= slot_limit:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="해당 슬롯 정원이 가득 찼습니다.")
 
 
 def move_member_to_slot(
@@ -400,6 +547,7 @@ def move_member_to_slot(
     target_state: str | None = None,
     party: Party | None = None,
     member: PartyMember | None = None,
+    target_slot: PartySlot | None = None,
 ) -> PartyMember:
     party = party or _get_party_or_404(session, party_id)
     member = member or session.get(PartyMember, member_id)
@@ -407,7 +555,7 @@ def move_member_to_slot(
     if member is None or member.party_id != party.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="파티원을 찾을 수 없습니다.")
 
-    target_slot = _get_slot_or_404(session, party.id, target_slot_id)
+    target_slot = target_slot or _get_slot_or_404(session, party.id, target_slot_id)
 
     if member.slot_id == target_slot.id:
         return member
@@ -427,32 +575,63 @@ def move_member_to_slot(
     session.add(member)
     if commit:
         session.commit()
-        session.refresh(member)
     return member
-def _require_active_member(session: Session, party_id: int, member_id: int) -> PartyMember:
-    _get_party_or_404(session, party_id)
-    member = session.get(PartyMember, member_id)
-    if member is None or member.party_id != party_id:
+
+
+# (party_id, member_id) -> (state, applicant_name) for chat permission checks.
+# Host actions that change a member drop its entry (see _forget_member).
+chat_member_cache = ExpiringLRUCache(CHAT_MEMBER_CACHE_MAXSIZE)
+
+
+def _forget_member(party_id: int, member_id: int) -> None:
+    chat_member_cache.discard((party_id, member_id))
+    manager.expire_member(party_id, member_id)
+
+
+class ChatMember(NamedTuple):
+    """The member columns chat needs; avoids loading the full row."""
+
+    id: int
+    applicant_name: str
+
+
+def _require_active_member(session: Session, party_id: int, member_id: int) -> ChatMember:
+    key = (party_id, member_id)
+    cached = chat_member_cache.get(key)
+    if cached is not None:
+        state, applicant_name = cached
+    else:
+        row = session.exec(
+            select(Party.id, PartyMember.state, PartyMember.applicant_name)
+            .outerjoin(PartyMember, and_(PartyMember.party_id == Party.id, PartyMember.id == member_id))
+            .where(Party.id == party_id)
+        ).first()
+        if row is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="파티를 찾을 수 없습니다.")
+        _, state, applicant_name = row
+        if state is not None:
+            chat_member_cache.set(key, (state, applicant_name), time.time() + CHAT_MEMBER_CACHE_TTL_SECONDS)
+    if state is None:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="파티원만 채팅할 수 있습니다.")
-    if member.state == MemberState.REJECTED:
+    if state == MemberState.REJECTED:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="채팅이 차단된 파티원입니다.")
-    return member
+    return ChatMember(member_id, applicant_name)
 
 
-def _serialize_chat_message(message: ChatMessage) -> dict:
-    return {
-        "id": message.id,
-        "party_id": message.party_id,
-        "member_id": message.member_id,
-        "author_name": message.author_name,
-        "content": message.content,
-        "created_at": message.created_at.isoformat(),
-    }
+def _encode_chat_message(message: ChatMessage) -> str:
+    # orjson writes naive datetimes exactly like isoformat(), in C.
+    return orjson.dumps(_row_dict(message, _CHAT_READ_FIELDS)).decode()
 
 
 def _create_chat_message(
-    session: Session, party_id: int, member: PartyMember, content: str, author_name: str | None
-) -> ChatMessage:
+    session: Session, party_id: int, member: ChatMember, content: str, author_name: str | None
+) -> tuple[ChatMessage, str]:
+    """Store a chat message and return it with its broadcast payload.
+
+    The payload is encoded once here, right after the commit, so every
+    subscriber queue receives the same immutable string.
+    """
+
     if not content or not content.strip():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="메시지 내용은 비워둘 수 없습니다.")
 
@@ -464,8 +643,7 @@ def _create_chat_message(
     )
     session.add(message)
     session.commit()
-    session.refresh(message)
-    return message
+    return message, _encode_chat_message(message)
 
 
 @app.post("/parties", response_model=PartyDetail, status_code=status.HTTP_201_CREATED, tags=["parties"])
@@ -493,56 +671,102 @@ def create_party(
         )
 
     invite_code = payload.invite_code
-    if payload.visibility == PartyVisibility.PRIVATE and not invite_code:
-        invite_code = generate_invite_code()
-
-    party = Party(
-        **payload.dict(exclude={"invite_code", "host_identifier"}),
-        invite_code=invite_code,
-        host_identifier=host_identifier,
-        host_id=str(current_user.id),
-        host_name=current_user.username,
-    )
-    session.add(party)
-    session.commit()
-    session.refresh(party)
-    update_open_slot_count(session, party)
-    return PartyDetail.from_orm(party).copy(update={"slots": [], "members": []})
+    derive_code = payload.visibility == PartyVisibility.PRIVATE and not invite_code
+    # The unique index is the only reliable check: a caller-chosen code that
+    # is taken is a 409, a derived one that collides is derived again.
+    for rotation in range(INVITE_CODE_ATTEMPTS):
+        party = Party(
+            **payload.model_dump(exclude={"invite_code", "host_identifier"}),
+            invite_code=invite_code,
+            host_identifier=host_identifier,
+            host_id=str(current_user.id),
+            host_name=current_user.username,
+            slots=[],
+        )
+        recompute_open_slot_count(session, party)
+        try:
+            if derive_code:
+                session.flush()
+                party.invite_code = derive_invite_code(party.id, rotation=rotation)
+            session.commit()
+            break
+        except IntegrityError:
+            session.rollback()
+            if not derive_code:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT, detail="이미 사용 중인 초대 코드입니다."
+                )
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="초대 코드를 만들지 못했습니다. 다시 시도해주세요."
+        )
+    return _build_party_detail(party, [], [])
 
 
 @app.get("/parties", response_model=list[PartyDetail], tags=["parties"])
 def list_parties(
     session: Session = Depends(get_session),
-    visibility: str | None = Query(default=None, regex="^(public|private)$"),
+    visibility: PartyVisibility | None = Query(default=None),
     role: str | None = Query(default=None, description="필터링할 슬롯 역할"),
     q: str | None = Query(default=None, description="제목 검색어"),
-) -> list[PartyDetail]:
+) -> ORJSONResponse:
     statement = select(Party)
     if visibility:
-        statement = statement.where(Party.visibility == visibility)
+        statement = statement.where(Party.visibility == visibility.value)
     if q:
-        statement = statement.where(Party.title.ilike(f"%{q}%"))
+        statement = statement.where(party_title_filter(q))
     parties = session.exec(statement).all()
-
-    results: list[PartyDetail] = []
-    for party in parties:
-        slots_stmt = select(PartySlot).where(PartySlot.party_id == party.id)
-        members_stmt = select(PartyMember).where(PartyMember.party_id == party.id)
-        if role:
-            slots_stmt = slots_stmt.where(PartySlot.role.ilike(f"%{role}%"))
-            members_stmt = members_stmt.where(PartyMember.slot_id.in_(select(PartySlot.id).where(PartySlot.role.ilike(f"%{role}%"))))
-        slots = session.exec(slots_stmt).all()
-        members = session.exec(members_stmt).all()
-        results.append(PartyDetail.from_orm(party).copy(update={"slots": slots, "members": members}))
-    return results
+    if not parties:
+        return ORJSONResponse([])
+
+    party_ids = [party.id for party in parties]
+    slots_stmt = select(PartySlot).where(PartySlot.party_id.in_(party_ids))
+    members_stmt = select(PartyMember).where(PartyMember.party_id.in_(party_ids))
+    if role:
+        slots_stmt = slots_stmt.where(PartySlot.role.ilike(f"%{role}%"))
+
+    slots_by_party: dict[int, list[PartySlot]] = defaultdict(list)
+    slot_ids: set[int] = set()
+    for slot in session.exec(slots_stmt).all():
+        slots_by_party[slot.party_id].append(slot)
+        slot_ids.add(slot.id)
+    members_by_party: dict[int, list[PartyMember]] = defaultdict(list)
+    for member in session.exec(members_stmt).all():
+        if role and member.slot_id not in slot_ids:
+            continue
+        members_by_party[member.party_id].append(member)
+
+    return ORJSONResponse(
+        [
+            _party_detail_dict(party, slots_by_party[party.id], members_by_party[party.id])
+            for party in parties
+        ]
+    )
 
 
 @app.get("/parties/{party_id}", response_model=PartyDetail, tags=["parties"])
-def read_party(party_id: int, session: Session = Depends(get_session)) -> PartyDetail:
-    party = _get_party_or_404(session, party_id)
-    slots = session.exec(select(PartySlot).where(PartySlot.party_id == party_id)).all()
-    members = session.exec(select(PartyMember).where(PartyMember.party_id == party_id)).all()
-    return PartyDetail.from_orm(party).copy(update={"slots": slots, "members": members})
+def read_party(party_id: int, request: Request, session: Session = Depends(get_session)) -> Response:
+    cached = party_detail_cache.get(party_id)
+    if cached is None:
+        party = session.exec(
+            select(Party)
+            .where(Party.id == party_id)
+            .options(selectinload(Party.slots), selectinload(Party.members))
+        ).first()
+        if party is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="파티를 찾을 수 없습니다.")
+        body = orjson.dumps(_party_detail_dict(party, party.slots, party.members))
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        cached = (body, etag)
+        party_detail_cache.set(party_id, cached, time.time() + PARTY_DETAIL_CACHE_TTL_SECONDS)
+
+    body, etag = cached
+    # Polling clients revalidate with If-None-Match; an unchanged party costs
+    # a cache lookup (or one load) and no body at all.
+    headers = {"etag": etag, "cache-control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
 
 
 @app.post("/parties/{party_id}/slots", response_model=PartySlotRead, status_code=status.HTTP_201_CREATED, tags=["slots"])
@@ -550,10 +774,10 @@ def create_slot(
     party_id: int,
     payload: PartySlotCreate,
     session: Session = Depends(get_session),
-    _: Party = Depends(require_host_or_admin),
+    party: Party = Depends(require_host_or_admin),
 ) -> PartySlotRead:
-    party = _get_party_or_404(session, party_id)
-    open_slots = calculate_open_slot_count(session, party)
+    # Capped parties load party.slots once here; uncapped ones never touch it.
+    open_slots = calculate_open_slot_count(party)
     if open_slots is not None and open_slots <= 0:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="파티 정원을 초과할 수 없습니다.")
 
@@ -565,11 +789,18 @@ def create_slot(
             detail="슬롯 프리셋은 등록된 마스터 프리셋 ID로 지정해야 합니다.",
         )
 
-    slot = PartySlot(**payload.dict(), party_id=party_id)
-    session.add(slot)
+    slot = PartySlot(**payload.model_dump())
+    if open_slots is None:
+        # No capacity means no open slot count to maintain, so skip loading
+        # the slot collection just to append to it.
+        slot.party_id = party_id
+        session.add(slot)
+    else:
+        party.slots.append(slot)
+        party.open_slot_count = open_slots - 1
+        session.add(party)
     session.commit()
-    session.refresh(slot)
-    update_open_slot_count(session, party)
+    _forget_party_detail(party_id)
     return slot
 
 
@@ -585,29 +816,23 @@ def join_party_by_code(
     _user: AuthenticatedUser = Depends(require_role("user", "guest")),
 ) -> PartyJoinResponse:
     party = session.exec(
-        select(Party).where(
-            Party.visibility == PartyVisibility.PRIVATE,
-            Party.invite_code == payload.invite_code,
-        )
+        select(Party)
+        .where(Party.invite_code == payload.invite_code)
+        .options(selectinload(Party.slots), selectinload(Party.members))
     ).first()
-    if party is None:
+    if party is None or party.visibility != PartyVisibility.PRIVATE:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="초대 코드에 해당하는 비공개 파티를 찾을 수 없습니다."
         )
 
-    member = PartyMember(
-        party_id=party.id,
-        applicant_name=payload.applicant_name,
-        state=MemberState.WAITING,
-    )
-    session.add(member)
+    member = PartyMember(applicant_name=payload.applicant_name, state=MemberState.WAITING)
+    # Appending through the loaded relationship keeps party.members current
+    # without re-selecting the member list after the insert.
+    party.members.append(member)
     session.commit()
-    session.refresh(member)
-
-    slots = session.exec(select(PartySlot).where(PartySlot.party_id == party.id)).all()
-    members = session.exec(select(PartyMember).where(PartyMember.party_id == party.id)).all()
-    party_detail = PartyDetail.from_orm(party).copy(update={"slots": slots, "members": members})
+    _forget_party_detail(party.id)
 
+    party_detail = _build_party_detail(party, party.slots, party.members)
     return PartyJoinResponse(party=party_detail, member=member)
 
 
@@ -663,7 +888,7 @@ def apply_to_party(
 
     session.add(member)
     session.commit()
-    session.refresh(member)
+    _forget_party_detail(party_id)
     return member
 
 
@@ -677,20 +902,34 @@ def update_member_state(
     member_id: int,
     payload: PartyMemberStateUpdate,
     session: Session = Depends(get_session),
-    _: Party = Depends(require_host_or_admin),
+    party: Party = Depends(require_host_or_admin),
 ) -> PartyMemberRead:
-    party = _get_party_or_404(session, party_id)
-    member = session.get(PartyMember, member_id)
-    if member is None or member.party_id != party_id:
+    # Load the member together with its current slot and the requested slot.
+    current_slot = aliased(PartySlot)
+    requested_slot = aliased(PartySlot)
+    statement = (
+        select(PartyMember, current_slot, requested_slot)
+        .outerjoin(current_slot, current_slot.id == PartyMember.slot_id)
+        .outerjoin(
+            requested_slot,
+            and_(requested_slot.id == payload.slot_id, requested_slot.party_id == party_id),
+        )
+        .where(PartyMember.id == member_id, PartyMember.party_id == party_id)
+    )
+    row = session.exec(statement).first()
+    if row is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="파티원을 찾을 수 없습니다.")
+    member, target_slot, requested = row
 
-    target_slot = session.get(PartySlot, member.slot_id) if member.slot_id else None
+    capacity_checked = False
     if payload.slot_id is not None:
         if member.state != MemberState.WAITING:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="대기 상태에서만 슬롯을 배정할 수 있습니다.",
             )
+        if requested is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="해당 파티의 슬롯을 찾을 수 없습니다.")
 
         if payload.slot_id != member.slot_id:
             member = move_member_to_slot(
@@ -702,15 +941,19 @@ def update_member_state(
                 target_state=payload.state,
                 party=party,
                 member=member,
+                target_slot=requested,
             )
-            target_slot = session.get(PartySlot, payload.slot_id)
+            capacity_checked = True
+        target_slot = requested
 
-    _ensure_capacity_constraints(session, party, target_slot, member, payload.state)
+    if not capacity_checked:
+        _ensure_capacity_constraints(session, party, target_slot, member, payload.state)
 
     member.state = payload.state
     session.add(member)
     session.commit()
-    session.refresh(member)
+    _forget_member(party_id, member_id)
+    _forget_party_detail(party_id)
     return member
 
 
@@ -723,10 +966,8 @@ def remove_member(
     party_id: int,
     member_id: int,
     session: Session = Depends(get_session),
-    _: Party = Depends(require_host_or_admin),
+    _: None = Depends(check_host_or_admin),
 ) -> PartyMemberRead:
-    party = _get_party_or_404(session, party_id)
-
     member = session.get(PartyMember, member_id)
     if member is None or member.party_id != party_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="파티원을 찾을 수 없습니다.")
@@ -735,7 +976,8 @@ def remove_member(
     member.slot_id = None
     session.add(member)
     session.commit()
-    session.refresh(member)
+    _forget_member(party_id, member_id)
+    _forget_party_detail(party_id)
 
     logger.info("Member %s was kicked from party %s", member.id, party_id)
     return member
@@ -745,29 +987,46 @@ def remove_member(
 def regenerate_invite_code(
     party_id: int,
     session: Session = Depends(get_session),
-    _: Party = Depends(require_host_or_admin),
+    user: User = Depends(get_current_user),
 ) -> dict:
-    party = _get_party_or_404(session, party_id)
-    if party.visibility != PartyVisibility.PRIVATE:
+    # The code only depends on the id, so it is written without loading the row.
+    for _ in range(INVITE_CODE_ATTEMPTS):
+        invite_code = derive_invite_code(party_id, rotation=time.time_ns())
+        try:
+            updated = update_party_as_host(
+                session,
+                party_id,
+                user,
+                Party.visibility == PartyVisibility.PRIVATE,
+                invite_code=invite_code,
+            )
+            break
+        except IntegrityError:
+            session.rollback()
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="초대 코드를 만들지 못했습니다. 다시 시도해주세요."
+        )
+    if not updated:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="공개 파티는 초대 코드가 필요 없습니다.")
 
-    party.invite_code = generate_invite_code()
-    session.add(party)
     session.commit()
-    session.refresh(party)
-    return {"invite_code": party.invite_code}
+    _forget_party_detail(party_id)
+    return {"invite_code": invite_code}
 
 
 @app.get("/parties/{party_id}/slots", response_model=list[PartySlotRead], tags=["slots"])
-def list_slots(party_id: int, session: Session = Depends(get_session)) -> list[PartySlotRead]:
-    _get_party_or_404(session, party_id)
-    return session.exec(select(PartySlot).where(PartySlot.party_id == party_id)).all()
+def list_slots(party_id: int, session: Session = Depends(get_session)) -> ORJSONResponse:
+    _ensure_party_exists(session, party_id)
+    slots = session.exec(select(PartySlot).where(PartySlot.party_id == party_id))
+    return ORJSONResponse([_row_dict(slot, _SLOT_READ_FIELDS) for slot in slots])
 
 
 @app.get("/parties/{party_id}/members", response_model=list[PartyMemberRead], tags=["members"])
-def list_members(party_id: int, session: Session = Depends(get_session)) -> list[PartyMemberRead]:
-    _get_party_or_404(session, party_id)
-    return session.exec(select(PartyMember).where(PartyMember.party_id == party_id)).all()
+def list_members(party_id: int, session: Session = Depends(get_session)) -> ORJSONResponse:
+    _ensure_party_exists(session, party_id)
+    members = session.exec(select(PartyMember).where(PartyMember.party_id == party_id))
+    return ORJSONResponse([_row_dict(member, _MEMBER_READ_FIELDS) for member in members])
 
 
 @app.post(
@@ -778,17 +1037,19 @@ def list_members(party_id: int, session: Session = Depends(get_session)) -> list
 )
 async def post_chat_message(
     party_id: int, payload: ChatMessageCreate, session: Session = Depends(get_session)
-) -> ChatMessage:
+) -> Response:
     member = _require_active_member(session, party_id, payload.member_id)
-    message = _create_chat_message(
+    _, encoded = _create_chat_message(
         session=session,
         party_id=party_id,
         member=member,
         content=payload.content,
         author_name=payload.author_name,
     )
-    await manager.broadcast(party_id, _serialize_chat_message(message))
-    return message
+    await manager.broadcast(party_id, encoded)
+    # The broadcast payload is already the response body; reuse it rather
+    # than serializing the message a second time through response_model.
+    return Response(encoded, status_code=status.HTTP_201_CREATED, media_type="application/json")
 
 
 @app.get("/parties/{party_id}/chat", response_model=list[ChatMessageRead], tags=["chat"])
@@ -796,17 +1057,19 @@ def get_chat_history(
     party_id: int,
     member_id: int = Query(..., description="조회 요청을 하는 파티원 ID"),
     limit: int = Query(50, gt=0, le=200, description="가져올 최대 메시지 수"),
+    before_id: int | None = Query(None, description="이 메시지 ID보다 이전 메시지만 조회"),
     session: Session = Depends(get_session),
-) -> list[ChatMessageRead]:
+) -> ORJSONResponse:
     _require_active_member(session, party_id, member_id)
-    statement = (
-        select(ChatMessage)
-        .where(ChatMessage.party_id == party_id)
-        .order_by(ChatMessage.created_at.desc())
-        .limit(limit)
-    )
-    messages = session.exec(statement).all()
-    return list(reversed(messages))
+    # Keyset pagination on the primary key: ids grow with time, so the newest
+    # page is an index range scan with no sort on created_at.
+    statement = select(ChatMessage).where(ChatMessage.party_id == party_id)
+    if before_id is not None:
+        statement = statement.where(ChatMessage.id < before_id)
+    statement = statement.order_by(ChatMessage.id.desc()).limit(limit)
+    messages = [_row_dict(message, _CHAT_READ_FIELDS) for message in session.exec(statement)]
+    messages.reverse()
+    return ORJSONResponse(messages)
 
 
 @app.websocket("/ws/parties/{party_id}")
@@ -829,22 +1092,28 @@ async def chat_websocket(websocket: WebSocket, party_id: int) -> None:
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=exc.detail)
             return
 
+    # Membership is re-checked at most every CHAT_MEMBER_RECHECK_SECONDS, or
+    # sooner when a host changes the member's state (see expire_member).
+    websocket.state.member_id = member_id
+    websocket.state.member_checked_at = time.monotonic()
     await manager.connect(party_id, websocket)
     try:
-        while True:
-            data = await websocket.receive_text()
-            with Session(engine) as ws_session:
-                member = _require_active_member(ws_session, party_id, member_id)
-                message = _create_chat_message(
+        # One session serves the whole connection; each message commits its
+        # own transaction, so the pooled connection is only held briefly.
+        with Session(engine, expire_on_commit=False) as ws_session:
+            async for data in websocket.iter_text():
+                if time.monotonic() - websocket.state.member_checked_at > CHAT_MEMBER_RECHECK_SECONDS:
+                    member = _require_active_member(ws_session, party_id, member_id)
+                    websocket.state.member_checked_at = time.monotonic()
+                _, encoded = _create_chat_message(
                     session=ws_session,
                     party_id=party_id,
                     member=member,
                     content=data,
                     author_name=None,
                 )
-                await manager.broadcast(party_id, _serialize_chat_message(message))
-    except WebSocketDisconnect:
-        manager.disconnect(party_id, websocket)
+                await manager.broadcast(party_id, encoded)
     except HTTPException as exc:
         await websocket.close(code=status.WS_1011_INTERNAL_ERROR, reason=exc.detail)
+    finally:
         manager.disconnect(party_id, websocket)
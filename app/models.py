@@ -1,16 +1,30 @@
 import secrets
 from datetime import datetime
-from typing import Optional
+from enum import IntEnum, StrEnum
+from typing import Any, Optional
 
 from fastapi import HTTPException, status
 from pydantic import ConfigDict, model_validator
-from sqlalchemy import Column, JSON, Text
+from sqlalchemy import Column, Enum, Index, JSON, SmallInteger, Text, text
+from sqlalchemy.types import TypeDecorator
 from sqlmodel import Field, Relationship, SQLModel
 
 GAME_ID_REGEX = r"^[A-Za-z0-9_-]{3,16}(#[0-9]{4})?$"
 
+# Gear presets and their metadata are free-form JSON objects.
+JSONObject = dict[str, Any]
 
-class GearPresetVisibility(str):
+
+def _enum_column(enum_cls: type[StrEnum]) -> Enum:
+    """Store a StrEnum as its plain string value and load it back as a member."""
+    return Enum(
+        enum_cls,
+        native_enum=False,
+        values_callable=lambda members: [member.value for member in members],
+    )
+
+
+class GearPresetVisibility(StrEnum):
     MASTER = "master"
     PERSONAL = "personal"
 
@@ -18,9 +32,9 @@ class GearPresetVisibility(str):
 class GearPresetBase(SQLModel):
     model_config = ConfigDict(populate_by_name=True)
     owner_id: str
-    visibility: str = Field(regex="^(master|personal)$")
-    preset: dict = Field(sa_column=Column(JSON))
-    metadata_: Optional[dict] = Field(
+    visibility: GearPresetVisibility = Field(sa_type=_enum_column(GearPresetVisibility))
+    preset: JSONObject = Field(sa_column=Column(JSON))
+    metadata_: Optional[JSONObject] = Field(
         default=None,
         sa_column=Column("metadata", JSON),
         alias="metadata",
@@ -34,20 +48,20 @@ class GearPreset(GearPresetBase, table=True):
 
 class GearPresetCreate(SQLModel):
     model_config = ConfigDict(populate_by_name=True)
-    preset: dict
-    metadata_: Optional[dict] = Field(default=None, alias="metadata")
+    preset: JSONObject
+    metadata_: Optional[JSONObject] = Field(default=None, alias="metadata")
 
 
 class GearPresetUpdate(SQLModel):
     model_config = ConfigDict(populate_by_name=True)
-    preset: Optional[dict] = None
-    metadata_: Optional[dict] = Field(default=None, alias="metadata")
+    preset: Optional[JSONObject] = None
+    metadata_: Optional[JSONObject] = Field(default=None, alias="metadata")
 
 
 class GearPresetRead(GearPresetBase):
     id: int
     created_at: datetime
-class UserRole(str):
+class UserRole(StrEnum):
     ADMIN = "admin"
     USER = "user"
     GUEST = "guest"
@@ -55,7 +69,7 @@ class UserRole(str):
 
 class UserBase(SQLModel):
     username: str = Field(index=True, sa_column_kwargs={"unique": True})
-    role: str = Field(default=UserRole.USER, regex="^(admin|user|guest)$")
+    role: UserRole = Field(default=UserRole.USER, sa_type=_enum_column(UserRole))
     game_id: str = Field(
         index=True, sa_column_kwargs={"unique": True}, regex=GAME_ID_REGEX
     )
@@ -76,6 +90,16 @@ class UserRegister(SQLModel):
     password: str
     game_id: str = Field(regex=GAME_ID_REGEX, alias="party_identifier")
     confirm_password: str | None = None
+    requested_role: str | None = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def map_requested_role(cls, values: dict) -> dict:
+        if isinstance(values, dict) and values.get("requested_role") is None:
+            role = values.get("role")
+            if isinstance(role, str):
+                return {**values, "requested_role": role}
+        return values
 
     @model_validator(mode="before")
     @classmethod
@@ -111,17 +135,17 @@ class UserRead(UserBase):
     id: int
 
 
-class PartyVisibility(str):
+class PartyVisibility(StrEnum):
     PUBLIC = "public"
     PRIVATE = "private"
 
 
-class PartyStatus(str):
+class PartyStatus(StrEnum):
     OPEN = "open"
     CLOSED = "closed"
 
 
-class MemberState(str):
+class MemberState(StrEnum):
     WAITING = "waiting"
     APPLIED = "applied"
     ACCEPTED = "accepted"
@@ -130,24 +154,74 @@ class MemberState(str):
     KICKED = "kicked"
 
 
+class MemberStateCode(IntEnum):
+    """Storage codes for member states; the API keeps the string names."""
+
+    WAITING = 0
+    APPLIED = 1
+    ACCEPTED = 2
+    LOCKED = 3
+    REJECTED = 4
+    KICKED = 5
+
+
+MEMBER_STATE_CODES = {code.name.lower(): int(code) for code in MemberStateCode}
+MEMBER_STATE_NAMES = {code: MemberState(name) for name, code in MEMBER_STATE_CODES.items()}
+# Shared verbatim by the partial index and the capacity query: planners only
+# use a partial index when the query repeats its predicate with literals.
+CONFIRMED_STATE_PREDICATE = (
+    f"state IN ({MEMBER_STATE_CODES[MemberState.ACCEPTED]}, {MEMBER_STATE_CODES[MemberState.LOCKED]})"
+)
+
+
+class MemberStateType(TypeDecorator):
+    """Store member states as small integers while exposing their names."""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[int]:
+        if value is None:
+            return None
+        return MEMBER_STATE_CODES[value]
+
+    def process_result_value(self, value: Optional[int | str], dialect) -> Optional[MemberState]:
+        if value is None:
+            return None
+        # Pre-migration SQLite columns keep TEXT affinity and return "2".
+        return MEMBER_STATE_NAMES[int(value)]
+
+
 class PartyBase(SQLModel):
     title: str
     description: Optional[str] = None
     host_tip: Optional[str] = Field(default=None, sa_column=Column(Text))
-    visibility: str = Field(default=PartyVisibility.PUBLIC)
+    visibility: PartyVisibility = Field(
+        default=PartyVisibility.PUBLIC, index=True, sa_type=_enum_column(PartyVisibility)
+    )
     schedule: Optional[str] = None
     capacity: Optional[int] = Field(default=None, ge=1)
     open_slot_count: Optional[int] = Field(default=None, ge=0)
     voice_channel_link: Optional[str] = None
-    status: str = Field(default=PartyStatus.OPEN)
+    status: PartyStatus = Field(default=PartyStatus.OPEN, sa_type=_enum_column(PartyStatus))
 
 
 class Party(PartyBase, table=True):
+    __table_args__ = (
+        Index(
+            "uq_party_invite_code",
+            "invite_code",
+            unique=True,
+            postgresql_where=text("invite_code IS NOT NULL"),
+            sqlite_where=text("invite_code IS NOT NULL"),
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     host_identifier: str = Field(regex=GAME_ID_REGEX)
     host_id: str
     host_name: str
-    invite_code: Optional[str] = Field(default=None, index=True)
+    invite_code: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     slots: list["PartySlot"] = Relationship(back_populates="party")
@@ -155,7 +229,7 @@ class Party(PartyBase, table=True):
 
 
 class PartyCreate(PartyBase):
-    visibility: str = Field(default=PartyVisibility.PUBLIC, regex="^(public|private)$")
+    visibility: PartyVisibility = PartyVisibility.PUBLIC
     host_identifier: Optional[str] = Field(default=None, regex=GAME_ID_REGEX)
     invite_code: Optional[str] = None
 
@@ -172,13 +246,13 @@ class PartyRead(PartyBase):
 class SlotBase(SQLModel):
     role: str
     ip_target: Optional[int] = Field(default=None, ge=0)
-    preset: Optional[dict] = Field(default=None, sa_column=Column(JSON))
-    gear_preset_id: Optional[int] = Field(default=None, foreign_key="gearpreset.id")
+    preset: Optional[JSONObject] = Field(default=None, sa_column=Column(JSON))
+    gear_preset_id: Optional[int] = Field(default=None, foreign_key="gearpreset.id", index=True)
 
 
 class PartySlot(SlotBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    party_id: int = Field(foreign_key="party.id")
+    party_id: int = Field(foreign_key="party.id", index=True)
 
     party: Optional[Party] = Relationship(back_populates="slots")
     members: list["PartyMember"] = Relationship(
@@ -197,11 +271,25 @@ class PartySlotRead(SlotBase):
 
 class MemberBase(SQLModel):
     applicant_name: str
-    gear_preset: Optional[dict] = Field(default=None, sa_column=Column(JSON))
-    state: str = Field(default=MemberState.WAITING)
+    gear_preset: Optional[JSONObject] = Field(default=None, sa_column=Column(JSON))
+    state: MemberState = Field(default=MemberState.WAITING, sa_type=MemberStateType)
 
 
 class PartyMember(MemberBase, table=True):
+    __table_args__ = (
+        Index("ix_partymember_party_state", "party_id", "state"),
+        Index("ix_partymember_slot_state", "slot_id", "state"),
+        # Capacity checks only count confirmed members; a partial index keeps
+        # that lookup small no matter how many rejected/kicked rows pile up.
+        Index(
+            "ix_partymember_confirmed",
+            "party_id",
+            "slot_id",
+            postgresql_where=text(CONFIRMED_STATE_PREDICATE),
+            sqlite_where=text(CONFIRMED_STATE_PREDICATE),
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     party_id: int = Field(foreign_key="party.id")
     slot_id: Optional[int] = Field(default=None, foreign_key="partyslot.id")
@@ -220,13 +308,13 @@ class PartyMember(MemberBase, table=True):
 class PartyMemberCreate(SQLModel):
     applicant_name: str
     gear_preset_id: Optional[int] = None
-    gear_preset: Optional[dict] = None
+    gear_preset: Optional[JSONObject] = None
     slot_id: Optional[int] = None
     invite_code: Optional[str] = None
 
 
 class PartyMemberStateUpdate(SQLModel):
-    state: str = Field(regex="^(waiting|applied|accepted|locked|rejected|kicked)$")
+    state: MemberState
     slot_id: Optional[int] = None
 
 
@@ -259,6 +347,8 @@ class ChatMessageBase(SQLModel):
 
 
 class ChatMessage(ChatMessageBase, table=True):
+    __table_args__ = (Index("ix_chatmessage_party_id", "party_id", "id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     party_id: int = Field(foreign_key="party.id")
     member_id: Optional[int] = Field(default=None, foreign_key="partymember.id")
@@ -1,29 +1,34 @@
 from fastapi import HTTPException, status
-from sqlalchemy import func
 from sqlmodel import Session, select
 
-from app.models import Party, PartySlot
+from app.models import Party
 
 
-def verify_host_permission(session: Session, party_id: int, host_identifier: str) -> Party:
-    party = session.get(Party, party_id)
-    if party is None:
+def verify_host_permission(session: Session, party_id: int, host_identifier: str) -> None:
+    """Check the party's host without loading the rest of the row."""
+
+    party_host = session.exec(select(Party.host_identifier).where(Party.id == party_id)).first()
+    if party_host is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="파티를 찾을 수 없습니다.")
-    if party.host_identifier != host_identifier:
+    if party_host != host_identifier:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="파티장만 수정할 수 있습니다.")
-    return party
 
 
-def calculate_open_slot_count(session: Session, party: Party) -> int | None:
+def calculate_open_slot_count(party: Party) -> int | None:
+    """Open slots left under the party's capacity.
+
+    Counts the ``party.slots`` collection: callers that already loaded it (or
+    created the party in this session) pay no query, others load it once.
+    """
+
     if party.capacity is None:
         return None
-    slot_count = session.exec(select(func.count()).where(PartySlot.party_id == party.id)).one()
-    return max(party.capacity - slot_count, 0)
+    return max(party.capacity - len(party.slots), 0)
+
 
+def recompute_open_slot_count(session: Session, party: Party) -> Party:
+    """Refresh ``party.open_slot_count``; the caller's commit persists it."""
 
-def update_open_slot_count(session: Session, party: Party) -> Party:
-    party.open_slot_count = calculate_open_slot_count(session, party)
+    party.open_slot_count = calculate_open_slot_count(party)
     session.add(party)
-    session.commit()
-    session.refresh(party)
     return party
@@ -1,9 +1,66 @@
+import base64
+from collections import OrderedDict
+import hashlib
+import os
 import secrets
-import string
+import threading
+import time
+from typing import Any
 
+_invite_code_secret = os.getenv("INVITE_CODE_SECRET")
+INVITE_CODE_SECRET = (
+    hashlib.sha256(_invite_code_secret.encode()).digest() if _invite_code_secret else secrets.token_bytes(32)
+)
 
-def generate_invite_code(length: int = 4) -> str:
-    """Generate a numeric invite code with the given length."""
 
-    alphabet = string.digits
-    return "".join(secrets.choice(alphabet) for _ in range(length))
+def derive_invite_code(party_id: int, rotation: int = 0) -> str:
+    """Derive a party's invite code from its id with keyed BLAKE2b.
+
+    Party ids are unique, so codes need no collision check against the
+    database. ``rotation`` changes the code when a host regenerates it.
+    """
+
+    digest = hashlib.blake2b(
+        party_id.to_bytes(8, "big") + rotation.to_bytes(8, "big"),
+        key=INVITE_CODE_SECRET,
+        digest_size=6,
+    ).digest()
+    return base64.b32encode(digest).decode().rstrip("=")
+
+
+class ExpiringLRUCache:
+    """Thread-safe LRU cache whose entries expire at an absolute epoch time."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Any, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any, expires_at: float) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: Any) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,33 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import delete
+from sqlmodel import SQLModel
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+os.environ["DATABASE_URL"] = "sqlite:///./test.db"
+
+from app import database  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database_schema() -> None:
+    # Build the schema once per run; tests only clear rows between them.
+    SQLModel.metadata.drop_all(database.engine)
+    database.create_db_and_tables()
+    yield
+
+
+def clear_database() -> None:
+    """Delete every row and re-seed the default admin, without any DDL."""
+
+    from app.auth import ensure_default_admin
+
+    with database.engine.begin() as conn:
+        for table in reversed(SQLModel.metadata.sorted_tables):
+            conn.execute(delete(table))
+    ensure_default_admin()
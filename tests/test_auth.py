@@ -1,11 +1,17 @@
+import asyncio
 import os
 import re
+import subprocess
 import sys
+import time
 from pathlib import Path
 
+import anyio
+import bcrypt
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
-from sqlmodel import SQLModel, Session, select
+from sqlmodel import Session, select
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT_DIR))
@@ -23,6 +29,8 @@ from app.auth import (
 )  # noqa: E402
 from app.main import app  # noqa: E402
 from app.models import User, UserRole  # noqa: E402
+from app.utils import ExpiringLRUCache  # noqa: E402
+from conftest import clear_database  # noqa: E402
 
 
 @pytest.fixture(autouse=True)
@@ -32,15 +40,16 @@ def stub_password_hashing(monkeypatch: pytest.MonkeyPatch) -> None:
 
 @pytest.fixture(autouse=True)
 def reset_database(stub_password_hashing: None) -> None:
-    SQLModel.metadata.drop_all(database.engine)
-    database.create_db_and_tables()
+    clear_database()
+    auth_module.token_cache.clear()
+    auth_module._verified_password_cache.clear()
     yield
 
 
 @pytest.fixture()
 def client(stub_password_hashing: None):
     def override_get_session():
-        with Session(database.engine) as session:
+        with Session(database.engine, expire_on_commit=False) as session:
             yield session
 
     app.dependency_overrides[database.get_session] = override_get_session
@@ -235,3 +244,199 @@ def test_private_party_join_does_not_require_gear_preset(client: TestClient) ->
     assert payload["party"]["id"] == party_data["id"]
     assert payload["member"]["applicant_name"] == "지원자"
     assert payload["member"]["gear_preset"] is None
+
+
+def test_verified_token_is_served_from_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    token = auth_module.create_access_token({"sub": "admin", "role": UserRole.ADMIN})
+
+    with Session(database.engine) as session:
+        user = auth_module.get_user_from_token(token, session)
+
+        def fail_decode(*args, **kwargs):
+            raise AssertionError("cached token should not be decoded again")
+
+        monkeypatch.setattr(auth_module.jwt, "decode", fail_decode)
+        cached_user = auth_module.get_user_from_token(token, session)
+
+    assert cached_user.id == user.id
+
+
+def test_invalid_token_is_not_cached() -> None:
+    with Session(database.engine) as session:
+        with pytest.raises(HTTPException):
+            auth_module.get_user_from_token("not-a-token", session)
+
+    assert auth_module.token_cache.get(auth_module._token_cache_key("not-a-token")) is None
+
+
+def _create_user_with_password(
+    username: str, password: str, game_id: str, hashed: str | None = None
+) -> None:
+    hashed = hashed or bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=4)).decode()
+    with Session(database.engine) as session:
+        session.add(User(username=username, role=UserRole.USER, hashed_password=hashed, game_id=game_id))
+        session.commit()
+
+
+def test_login_issues_token_for_valid_credentials(client: TestClient) -> None:
+    _create_user_with_password("login-user", "secret", "LoginUser1000")
+
+    response = client.post("/auth/login", data={"username": "login-user", "password": "secret"})
+
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+
+
+def test_login_rejects_wrong_password(client: TestClient) -> None:
+    _create_user_with_password("login-user", "secret", "LoginUser1000")
+
+    response = client.post("/auth/login", data={"username": "login-user", "password": "wrong"})
+
+    assert response.status_code == 401
+
+
+def test_login_verifies_dummy_hash_for_unknown_user(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    checked_hashes: list[str] = []
+
+    def record_verify(plain_password: str, hashed_password: str) -> bool:
+        checked_hashes.append(hashed_password)
+        return False
+
+    monkeypatch.setattr(auth_module, "verify_password", record_verify)
+
+    response = client.post("/auth/login", data={"username": "nobody", "password": "secret"})
+
+    assert response.status_code == 401
+    assert checked_hashes == [auth_module._dummy_password_hash()]
+
+
+def test_token_is_decoded_once_per_request(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    token = auth_module.create_access_token({"sub": "admin", "role": UserRole.ADMIN})
+    monkeypatch.setattr(auth_module, "token_cache", ExpiringLRUCache(maxsize=0))
+    original_decode = auth_module.jwt.decode
+    decode_calls: list[str] = []
+
+    def counting_decode(*args, **kwargs):
+        decode_calls.append(args[0])
+        return original_decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth_module.jwt, "decode", counting_decode)
+
+    response = client.post(
+        "/parties",
+        json={"title": "공개 파티", "visibility": "public"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == 201
+    assert decode_calls == [token]
+
+
+def test_default_admin_uses_precomputed_password_hash(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(auth_module, "ADMIN_PASSWORD_HASH", "precomputed-hash")
+
+    def fail_hash(password: str) -> str:
+        raise AssertionError("admin password should not be hashed at startup")
+
+    monkeypatch.setattr(auth_module, "get_password_hash", fail_hash)
+    auth_module.ensure_default_admin()
+
+    with Session(database.engine) as session:
+        admin_user = session.scalar(select(User).where(User.username == "admin"))
+
+    assert admin_user.hashed_password == "precomputed-hash"
+
+
+def test_invalid_token_skips_session_in_middleware(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def fail_session(*args, **kwargs):
+        raise AssertionError("no session should be opened for an invalid token")
+
+    monkeypatch.setattr(auth_module, "Session", fail_session)
+
+    response = client.get("/health", headers={"Authorization": "Bearer not-a-token"})
+
+    assert response.status_code == 200
+
+
+def test_token_without_exp_is_rejected() -> None:
+    token = auth_module.jwt.encode(
+        {"sub": "admin"}, auth_module.SIGNING_KEY, algorithm=auth_module.ALGORITHM
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        auth_module.decode_access_token(token)
+
+    assert exc_info.value.status_code == 401
+
+
+def test_repeated_login_skips_password_verification(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    argon2_hash = auth_module._argon2_hasher.hash("secret")
+    _create_user_with_password("login-user", "secret", "LoginUser1000", hashed=argon2_hash)
+    first = client.post("/auth/login", data={"username": "login-user", "password": "secret"})
+    assert first.status_code == 200
+
+    def fail_verify(*args, **kwargs):
+        raise AssertionError("cached credentials should not be re-verified")
+
+    monkeypatch.setattr(auth_module, "verify_password", fail_verify)
+    second = client.post("/auth/login", data={"username": "login-user", "password": "secret"})
+
+    assert second.status_code == 200
+
+
+def test_login_rehashes_legacy_bcrypt_password(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(auth_module, "get_password_hash", auth_module._argon2_hasher.hash)
+    _create_user_with_password("legacy-user", "secret", "LegacyUser1000")
+
+    response = client.post("/auth/login", data={"username": "legacy-user", "password": "secret"})
+
+    assert response.status_code == 200
+    with Session(database.engine) as session:
+        user = session.scalar(select(User).where(User.username == "legacy-user"))
+    assert user.hashed_password.startswith("$argon2id$")
+    assert auth_module.verify_password("secret", user.hashed_password)
+
+
+def test_login_returns_503_when_password_queue_is_full(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(auth_module, "PASSWORD_HASH_MAX_PENDING", 0)
+
+    response = client.post("/auth/login", data={"username": "admin", "password": "asdf1234"})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_asymmetric_algorithm_requires_both_keys() -> None:
+    env = {**os.environ, "JWT_ALGORITHM": "ES256", "JWT_PUBLIC_KEY": "public-pem"}
+    env.pop("JWT_PRIVATE_KEY", None)
+
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.auth"], cwd=ROOT_DIR, env=env, capture_output=True, text=True
+    )
+
+    assert result.returncode != 0
+    assert "JWT_PRIVATE_KEY" in result.stderr
+
+
+def test_password_hash_limiter_is_per_event_loop_and_counter_recovers() -> None:
+    async def scenario() -> anyio.CapacityLimiter:
+        task = asyncio.create_task(auth_module.run_password_hash_task(time.sleep, 0.05))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return auth_module._password_hash_limiter()
+
+    first = asyncio.run(scenario())
+    second = asyncio.run(scenario())
+
+    assert first is not second
+    assert auth_module._pending_password_hash_tasks == 0
@@ -0,0 +1,574 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import WebSocketDisconnect
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlmodel import Session
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+os.environ["DATABASE_URL"] = "sqlite:///./test.db"
+
+from app import database  # noqa: E402
+from app import main as main_module  # noqa: E402
+from app import auth as auth_module  # noqa: E402
+from app.auth import get_current_user  # noqa: E402
+from app.main import PartyWebSocketManager, app  # noqa: E402
+from app.models import PartyMember, User  # noqa: E402
+from conftest import clear_database  # noqa: E402
+
+HOST_USER = User(id=123, username="host-123", role="user", game_id="host123main")
+
+
+@pytest.fixture(autouse=True)
+def reset_database(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(auth_module, "get_password_hash", lambda password: f"hashed-{password}")
+    main_module.chat_member_cache.clear()
+    main_module.party_detail_cache.clear()
+    clear_database()
+    yield
+
+
+@pytest.fixture()
+def client():
+    def override_get_session():
+        with Session(database.engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[database.get_session] = override_get_session
+    app.dependency_overrides[get_current_user] = lambda: HOST_USER
+    # Entering the client keeps one event loop for HTTP calls and websockets,
+    # as in production, so chat relay tasks see broadcasts from requests.
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+def _create_party(client: TestClient, title: str, **fields) -> dict:
+    response = client.post("/parties", json={"title": title, **fields})
+    assert response.status_code == 201
+    return response.json()
+
+
+def _create_slot(client: TestClient, party_id: int, role: str) -> dict:
+    response = client.post(f"/parties/{party_id}/slots", json={"role": role})
+    assert response.status_code == 201
+    return response.json()
+
+
+def _apply(client: TestClient, party_id: int, name: str, slot_id: int | None = None) -> dict:
+    response = client.post(
+        f"/parties/{party_id}/apply", json={"applicant_name": name, "slot_id": slot_id}
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_list_parties_groups_slots_and_members_per_party(client: TestClient) -> None:
+    first = _create_party(client, "첫 번째 파티", capacity=5)
+    second = _create_party(client, "두 번째 파티", capacity=5)
+    healer = _create_slot(client, first["id"], "힐러")
+    _create_slot(client, first["id"], "탱커")
+    tank = _create_slot(client, second["id"], "탱커")
+    _apply(client, first["id"], "힐러 지원자", healer["id"])
+    _apply(client, second["id"], "탱커 지원자", tank["id"])
+
+    response = client.get("/parties")
+
+    assert response.status_code == 200
+    parties = {party["id"]: party for party in response.json()}
+    assert [slot["role"] for slot in parties[first["id"]]["slots"]] == ["힐러", "탱커"]
+    assert [slot["role"] for slot in parties[second["id"]]["slots"]] == ["탱커"]
+    assert [m["applicant_name"] for m in parties[first["id"]]["members"]] == ["힐러 지원자"]
+    assert [m["applicant_name"] for m in parties[second["id"]]["members"]] == ["탱커 지원자"]
+
+
+def test_list_parties_role_filter_limits_slots_and_members(client: TestClient) -> None:
+    party = _create_party(client, "역할 필터 파티", capacity=5)
+    healer = _create_slot(client, party["id"], "힐러")
+    tank = _create_slot(client, party["id"], "탱커")
+    _apply(client, party["id"], "힐러 지원자", healer["id"])
+    _apply(client, party["id"], "탱커 지원자", tank["id"])
+
+    response = client.get("/parties", params={"role": "힐러"})
+
+    assert response.status_code == 200
+    (listed,) = response.json()
+    assert [slot["role"] for slot in listed["slots"]] == ["힐러"]
+    assert [m["applicant_name"] for m in listed["members"]] == ["힐러 지원자"]
+
+
+def test_apply_rejects_when_party_capacity_is_reached(client: TestClient) -> None:
+    party = _create_party(client, "소규모 파티", capacity=1)
+    _apply(client, party["id"], "첫 지원자")
+
+    response = client.post(f"/parties/{party['id']}/apply", json={"applicant_name": "둘째 지원자"})
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "파티 정원이 가득 찼습니다."
+
+
+def test_capacity_count_uses_confirmed_member_index(client: TestClient) -> None:
+    party = _create_party(client, "인덱스 파티", capacity=2)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "GROUP BY partymember.slot_id" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(database.engine, "before_cursor_execute", record)
+    try:
+        _apply(client, party["id"], "첫 지원자")
+    finally:
+        event.remove(database.engine, "before_cursor_execute", record)
+
+    (statement, parameters), *_ = statements
+    with database.engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    assert any("ix_partymember_confirmed" in row[-1] for row in plan)
+
+
+def test_index_returns_not_modified_for_matching_etag(client: TestClient) -> None:
+    first = client.get("/")
+    assert first.status_code == 200
+    assert "max-age" in first.headers["cache-control"]
+
+    second = client.get("/", headers={"If-None-Match": first.headers["etag"]})
+
+    assert second.status_code == 304
+    assert second.content == b""
+
+
+def test_read_party_includes_slots_and_members(client: TestClient) -> None:
+    party = _create_party(client, "상세 파티", capacity=5)
+    slot = _create_slot(client, party["id"], "힐러")
+    _apply(client, party["id"], "지원자", slot["id"])
+
+    response = client.get(f"/parties/{party['id']}")
+
+    assert response.status_code == 200
+    detail = response.json()
+    assert [s["role"] for s in detail["slots"]] == ["힐러"]
+    assert [m["applicant_name"] for m in detail["members"]] == ["지원자"]
+    assert client.get("/parties/9999").status_code == 404
+
+
+def test_list_parties_filters_by_visibility(client: TestClient) -> None:
+    _create_party(client, "공개 파티", capacity=5)
+    _create_party(client, "비공개 파티", capacity=5, visibility="private")
+
+    response = client.get("/parties", params={"visibility": "private"})
+
+    assert response.status_code == 200
+    assert [party["title"] for party in response.json()] == ["비공개 파티"]
+    assert client.get("/parties", params={"visibility": "secret"}).status_code == 422
+
+
+def test_apply_rejects_when_slot_limit_is_reached(client: TestClient) -> None:
+    party = _create_party(client, "슬롯 제한 파티", capacity=5)
+    response = client.post(f"/parties/{party['id']}/slots", json={"role": "힐러", "ip_target": 1})
+    slot = response.json()
+    _apply(client, party["id"], "첫 지원자", slot["id"])
+
+    response = client.post(
+        f"/parties/{party['id']}/apply", json={"applicant_name": "둘째 지원자", "slot_id": slot["id"]}
+    )
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "해당 슬롯 정원이 가득 찼습니다."
+
+
+def test_chat_message_is_broadcast_to_websocket_subscribers(client: TestClient) -> None:
+    party = _create_party(client, "채팅 파티", capacity=5)
+    member = _apply(client, party["id"], "채팅 지원자")
+
+    with client.websocket_connect(f"/ws/parties/{party['id']}?member_id={member['id']}") as websocket:
+        response = client.post(
+            f"/parties/{party['id']}/chat", json={"member_id": member["id"], "content": " 안녕하세요 "}
+        )
+        assert response.status_code == 201
+        received = websocket.receive_json()
+
+    assert received == response.json()
+    assert received["author_name"] == "채팅 지원자"
+    assert received["content"] == "안녕하세요"
+
+
+def test_websocket_manager_drops_subscriber_with_full_queue() -> None:
+    class StalledSocket:
+        def __init__(self) -> None:
+            self.closed_with: int | None = None
+
+        async def accept(self) -> None:
+            return None
+
+        async def send_text(self, payload: str) -> None:
+            await asyncio.Event().wait()
+
+        async def close(self, code: int) -> None:
+            self.closed_with = code
+
+    async def scenario() -> StalledSocket:
+        manager = PartyWebSocketManager(queue_size=1)
+        socket = StalledSocket()
+        await manager.connect(1, socket)
+        for index in range(3):
+            await manager.broadcast(1, {"index": index})
+        await asyncio.sleep(0)
+        assert manager.active_connections == {}
+        return socket
+
+    assert asyncio.run(scenario()).closed_with == 1013
+
+
+def test_websocket_manager_drops_subscriber_when_send_fails() -> None:
+    class BrokenSocket:
+        async def accept(self) -> None:
+            return None
+
+        async def send_text(self, payload: str) -> None:
+            raise OSError("connection reset")
+
+    async def scenario() -> dict:
+        manager = PartyWebSocketManager()
+        await manager.connect(1, BrokenSocket())
+        await manager.broadcast(1, {"content": "hello"})
+        for _ in range(3):
+            await asyncio.sleep(0)
+        return manager.active_connections
+
+    assert asyncio.run(scenario()) == {}
+
+
+def test_update_member_state_assigns_requested_slot(client: TestClient) -> None:
+    party = _create_party(client, "모집 마감 파티", capacity=5, status="closed")
+    slot = _create_slot(client, party["id"], "힐러")
+    member = _apply(client, party["id"], "대기 지원자")
+    assert member["state"] == "waiting"
+    url = f"/parties/{party['id']}/members/{member['id']}/state"
+
+    missing = client.post(url, json={"state": "accepted", "slot_id": 9999})
+    response = client.post(url, json={"state": "accepted", "slot_id": slot["id"]})
+
+    assert missing.status_code == 404
+    assert response.status_code == 200
+    assert response.json()["state"] == "accepted"
+    assert response.json()["slot_id"] == slot["id"]
+
+
+def test_websocket_chat_stops_after_member_is_rejected(client: TestClient) -> None:
+    party = _create_party(client, "차단 파티", capacity=5)
+    member = _apply(client, party["id"], "차단될 지원자")
+
+    with client.websocket_connect(f"/ws/parties/{party['id']}?member_id={member['id']}") as websocket:
+        websocket.send_text("첫 메시지")
+        assert websocket.receive_json()["content"] == "첫 메시지"
+
+        response = client.post(
+            f"/parties/{party['id']}/members/{member['id']}/state", json={"state": "rejected"}
+        )
+        assert response.status_code == 200
+        websocket.send_text("두 번째 메시지")
+        with pytest.raises(WebSocketDisconnect) as excinfo:
+            websocket.receive_json()
+
+    assert excinfo.value.code == 1011
+
+
+def test_chat_history_requires_party_member(client: TestClient) -> None:
+    party = _create_party(client, "기록 파티", capacity=5)
+    member = _apply(client, party["id"], "기록 지원자")
+
+    ok = client.get(f"/parties/{party['id']}/chat", params={"member_id": member["id"]})
+    stranger = client.get(f"/parties/{party['id']}/chat", params={"member_id": member["id"] + 100})
+    missing = client.get("/parties/9999/chat", params={"member_id": member["id"]})
+
+    assert ok.status_code == 200
+    assert stranger.status_code == 403
+    assert missing.status_code == 404
+
+
+def test_chat_history_pages_backwards_by_message_id(client: TestClient) -> None:
+    party = _create_party(client, "페이지 파티", capacity=5)
+    member = _apply(client, party["id"], "기록 지원자")
+    for index in range(5):
+        client.post(f"/parties/{party['id']}/chat", json={"member_id": member["id"], "content": f"메시지 {index}"})
+    url = f"/parties/{party['id']}/chat"
+
+    latest = client.get(url, params={"member_id": member["id"], "limit": 2}).json()
+    older = client.get(
+        url, params={"member_id": member["id"], "limit": 2, "before_id": latest[0]["id"]}
+    ).json()
+
+    assert [message["content"] for message in latest] == ["메시지 3", "메시지 4"]
+    assert [message["content"] for message in older] == ["메시지 1", "메시지 2"]
+
+
+def test_create_party_rejects_duplicate_invite_code(client: TestClient) -> None:
+    _create_party(client, "첫 비공개 파티", visibility="private", invite_code="CODE-1")
+
+    response = client.post(
+        "/parties", json={"title": "둘째 비공개 파티", "visibility": "private", "invite_code": "CODE-1"}
+    )
+
+    assert response.status_code == 409
+
+
+def test_private_party_invite_code_is_derived_and_rotated(client: TestClient) -> None:
+    party = _create_party(client, "초대 파티", visibility="private")
+    assert len(party["invite_code"]) == 10
+
+    response = client.post(f"/parties/{party['id']}/invite-code")
+    rotated = response.json()["invite_code"]
+    joined = client.post(
+        "/parties/join-by-code", json={"invite_code": rotated, "applicant_name": "초대 지원자"}
+    )
+
+    assert response.status_code == 200
+    assert rotated != party["invite_code"]
+    assert joined.status_code == 201
+    assert joined.json()["party"]["id"] == party["id"]
+    assert [m["applicant_name"] for m in joined.json()["party"]["members"]] == ["초대 지원자"]
+
+
+def test_list_parties_title_search_matches_substrings(client: TestClient) -> None:
+    _create_party(client, "Avalon Raid 원정", capacity=5)
+    _create_party(client, "Castle Siege", capacity=5)
+
+    long_term = client.get("/parties", params={"q": "lon rai"}).json()
+    short_term = client.get("/parties", params={"q": "원정"}).json()
+
+    assert [party["title"] for party in long_term] == ["Avalon Raid 원정"]
+    assert [party["title"] for party in short_term] == ["Avalon Raid 원정"]
+    assert client.get("/parties", params={"q": "dungeon"}).json() == []
+
+
+def test_reconfirming_member_skips_capacity_count(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    party = _create_party(client, "재확인 파티", capacity=1)
+    member = _apply(client, party["id"], "확정 지원자")
+    assert member["state"] == "accepted"
+
+    def fail_count(*args, **kwargs):
+        raise AssertionError("capacity should not be recounted")
+
+    monkeypatch.setattr(main_module, "_confirmed_counts", fail_count)
+    response = client.post(
+        f"/parties/{party['id']}/members/{member['id']}/state", json={"state": "locked"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["state"] == "locked"
+
+
+def test_chat_post_uses_cached_member_until_host_changes_it(client: TestClient) -> None:
+    party = _create_party(client, "캐시 파티", capacity=5)
+    member = _apply(client, party["id"], "캐시 지원자")
+    url = f"/parties/{party['id']}/chat"
+
+    first = client.post(url, json={"member_id": member["id"], "content": "하나"})
+    assert main_module.chat_member_cache.get((party["id"], member["id"])) is not None
+    client.post(f"/parties/{party['id']}/members/{member['id']}/state", json={"state": "rejected"})
+    blocked = client.post(url, json={"member_id": member["id"], "content": "둘"})
+
+    assert first.status_code == 201
+    assert blocked.status_code == 403
+
+
+def test_remove_member_requires_party_host(client: TestClient) -> None:
+    party = _create_party(client, "강퇴 파티", capacity=5)
+    member = _apply(client, party["id"], "강퇴될 지원자")
+    url = f"/parties/{party['id']}/members/{member['id']}"
+
+    app.dependency_overrides[get_current_user] = lambda: User(
+        id=456, username="other-456", role="user", game_id="other456"
+    )
+    forbidden = client.delete(url)
+    app.dependency_overrides[get_current_user] = lambda: HOST_USER
+    kicked = client.delete(url)
+
+    assert forbidden.status_code == 403
+    assert kicked.status_code == 200
+    assert kicked.json()["state"] == "kicked"
+    assert client.delete(f"/parties/9999/members/{member['id']}").status_code == 404
+
+
+def test_create_party_rejects_unknown_status(client: TestClient) -> None:
+    response = client.post("/parties", json={"title": "잘못된 상태", "status": "archived"})
+
+    assert response.status_code == 422
+
+
+def test_list_slots_and_members_return_rows(client: TestClient) -> None:
+    party = _create_party(client, "목록 파티", capacity=5)
+    slot = _create_slot(client, party["id"], "탱커")
+    member = _apply(client, party["id"], "목록 지원자", slot_id=slot["id"])
+
+    slots = client.get(f"/parties/{party['id']}/slots")
+    members = client.get(f"/parties/{party['id']}/members")
+    missing = client.get("/parties/9999/members")
+
+    assert slots.json() == [slot]
+    assert members.json() == [member]
+    assert missing.status_code == 404
+
+
+def test_party_detail_cache_is_dropped_on_changes(client: TestClient) -> None:
+    party = _create_party(client, "캐시 파티", capacity=5)
+    url = f"/parties/{party['id']}"
+
+    before = client.get(url).json()
+    assert main_module.party_detail_cache.get(party["id"]) is not None
+    slot = _create_slot(client, party["id"], "딜러")
+    with_slot = client.get(url).json()
+    member = _apply(client, party["id"], "캐시 지원자", slot_id=slot["id"])
+    with_member = client.get(url).json()
+
+    assert before["slots"] == []
+    assert with_slot["slots"] == [slot]
+    assert with_member["members"] == [member]
+    assert client.get("/parties/9999").status_code == 404
+
+
+def test_master_preset_list_matches_created_preset(client: TestClient) -> None:
+    created = client.post(
+        "/gear-presets/master",
+        params={"admin_id": "admin"},
+        json={"preset": {"head": "T8 투구"}},
+    )
+
+    listed = client.get("/gear-presets/master")
+
+    assert created.status_code == 201
+    assert listed.json() == [created.json()]
+
+
+def test_invite_code_rotation_checks_host_and_visibility(client: TestClient) -> None:
+    private = _create_party(client, "비공개 회전 파티", visibility="private")
+    public = _create_party(client, "공개 회전 파티")
+
+    app.dependency_overrides[get_current_user] = lambda: User(
+        id=456, username="other-456", role="user", game_id="other456"
+    )
+    forbidden = client.post(f"/parties/{private['id']}/invite-code")
+    app.dependency_overrides[get_current_user] = lambda: HOST_USER
+    public_response = client.post(f"/parties/{public['id']}/invite-code")
+    missing = client.post("/parties/9999/invite-code")
+
+    assert forbidden.status_code == 403
+    assert public_response.status_code == 400
+    assert missing.status_code == 404
+    assert client.get(f"/parties/{private['id']}").json()["invite_code"] == private["invite_code"]
+
+
+def test_party_detail_revalidates_with_etag(client: TestClient) -> None:
+    party = _create_party(client, "ETag 파티", capacity=5)
+    url = f"/parties/{party['id']}"
+
+    first = client.get(url)
+    etag = first.headers["etag"]
+    unchanged = client.get(url, headers={"If-None-Match": etag})
+    main_module.party_detail_cache.clear()
+    reloaded = client.get(url, headers={"If-None-Match": etag})
+    _create_slot(client, party["id"], "힐러")
+    changed = client.get(url, headers={"If-None-Match": etag})
+
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert reloaded.status_code == 304
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+LEGACY_PARTYMEMBER_DDL = """
+CREATE TABLE partymember (
+    applicant_name VARCHAR NOT NULL,
+    gear_preset JSON,
+    state VARCHAR NOT NULL,
+    id INTEGER NOT NULL PRIMARY KEY,
+    party_id INTEGER NOT NULL REFERENCES party (id),
+    slot_id INTEGER REFERENCES partyslot (id),
+    requested_slot_id INTEGER REFERENCES partyslot (id),
+    created_at DATETIME NOT NULL
+)
+"""
+
+
+def test_member_state_migration_converts_legacy_names(client: TestClient) -> None:
+    party = _create_party(client, "이전 파티", capacity=5)
+    with database.engine.begin() as conn:
+        conn.execute(text("DROP TABLE partymember"))
+        conn.execute(text(LEGACY_PARTYMEMBER_DDL))
+        conn.execute(
+            text(
+                "INSERT INTO partymember (applicant_name, state, party_id, created_at) VALUES "
+                "('수락된 지원자', 'accepted', :party_id, '2024-01-01 00:00:00'), "
+                "('알 수 없는 지원자', 'bogus', :party_id, '2024-01-01 00:00:00')"
+            ),
+            {"party_id": party["id"]},
+        )
+
+    try:
+        database._migrate_member_state_codes()
+        database._migrate_member_state_codes()
+        members = client.get(f"/parties/{party['id']}/members")
+    finally:
+        with database.engine.begin() as conn:
+            conn.execute(text("DROP TABLE partymember"))
+        PartyMember.__table__.create(database.engine)
+
+    assert members.status_code == 200
+    assert [member["state"] for member in members.json()] == ["accepted", "waiting"]
+
+
+def test_startup_resets_unknown_party_visibility_and_status(client: TestClient) -> None:
+    party = _create_party(client, "오래된 파티")
+    with database.engine.begin() as conn:
+        conn.execute(
+            text("UPDATE party SET visibility = 'bogus', status = 'archived' WHERE id = :id"),
+            {"id": party["id"]},
+        )
+
+    database.create_db_and_tables()
+    response = client.get("/parties")
+
+    assert response.status_code == 200
+    assert response.json()[0]["visibility"] == "public"
+    assert response.json()[0]["status"] == "open"
+
+
+def test_invite_code_rotation_retries_on_collision(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    taken = _create_party(client, "기존 비공개 파티", visibility="private")["invite_code"]
+    party = _create_party(client, "회전 충돌 파티", visibility="private")
+    url = f"/parties/{party['id']}/invite-code"
+
+    codes = iter([taken, "FRESHCODE1"])
+    monkeypatch.setattr(main_module, "derive_invite_code", lambda party_id, rotation=0: next(codes))
+    retried = client.post(url)
+    monkeypatch.setattr(main_module, "derive_invite_code", lambda party_id, rotation=0: taken)
+    exhausted = client.post(url)
+
+    assert retried.status_code == 200
+    assert retried.json()["invite_code"] == "FRESHCODE1"
+    assert exhausted.status_code == 409
+
+
+def test_create_party_rederives_colliding_invite_code(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    taken = _create_party(client, "선점 파티", visibility="private", invite_code="TAKENCODE1")
+    codes = iter([taken["invite_code"], "FRESHCODE2"])
+    monkeypatch.setattr(main_module, "derive_invite_code", lambda party_id, rotation=0: next(codes))
+
+    party = _create_party(client, "충돌 파티", visibility="private")
+
+    assert party["invite_code"] == "FRESHCODE2"
+    assert len(client.get("/parties").json()) == 2